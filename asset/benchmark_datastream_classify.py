@@ -0,0 +1,47 @@
+"""
+量測微型感測器 Datastream 分類的成本
+
+比較每次都掃描關鍵字表與使用快取兩種方式, 在數千個 Datastream 下的耗時。
+需在已安裝 Home Assistant 的開發環境執行:
+    python asset/benchmark_datastream_classify.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.taiwan_aqm.parser import classify_datastream  # noqa: E402
+
+NAMES = (
+    "PM2.5", "PM10", "PM1", "Temperature", "Humidity", "Main Temperature",
+    "Main Humidity", "CO", "O3", "NO2", "TVOC", "Voltage", "Signal",
+)
+ROUNDS = 5
+
+
+def run(classify, names) -> float:
+    """回傳分類全部名稱的耗時 (毫秒)"""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for name in names:
+            classify(name)
+    return (time.perf_counter() - start) * 1000 / ROUNDS
+
+
+def main():
+    uncached = classify_datastream.__wrapped__
+
+    print(f"{'datastreams':>12} {'uncached(ms)':>13} {'cached(ms)':>11}")
+    for count in (1000, 2000, 5000):
+        names = [random.choice(NAMES) for _ in range(count)]
+        classify_datastream.cache_clear()
+        print(
+            f"{count:>12} {run(uncached, names):>13.2f} "
+            f"{run(classify_datastream, names):>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+比較感測器實體的記憶體用量與建立時間
+
+- legacy: 每個實體從 SENSOR_INFO 複製九個實例屬性 (舊版寫法)
+- shared: 所有實體共用由 SENSOR_INFO 產生的 SensorEntityDescription,
+  每個實體只保存 (ID, 類型) 與描述的參考
+
+量測內容包含建立實體, 以及讀取加入平台時會保存的名稱、unique_id 與
+device_info。分別量測 1、20、85 個測站。需在已安裝 Home Assistant 的開發環境執行:
+    python asset/benchmark_entity_layout.py
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.components.sensor import SensorEntity  # noqa: E402
+from homeassistant.helpers.update_coordinator import CoordinatorEntity  # noqa: E402
+
+from custom_components.taiwan_aqm.const import DOMAIN, SENSOR_INFO  # noqa: E402
+from custom_components.taiwan_aqm.sensor import (  # noqa: E402
+    SITE_SENSOR_DESCRIPTIONS,
+    SiteSensor,
+)
+
+ROUNDS = 5
+
+
+class FakeCoordinator:
+    """只提供建立實體時需要的欄位"""
+
+    def async_add_listener(self, *args, **kwargs):
+        return lambda: None
+
+
+class LegacySiteSensor(CoordinatorEntity, SensorEntity):
+    """舊版的實體配置: 每個實體保存九個實例屬性"""
+
+    def __init__(
+        self, coordinator, siteid, sitename, aq_type, device_class,
+        unit_of_measurement, state_class, display_precision, icon,
+    ):
+        super().__init__(coordinator)
+        self._station_or_site_id = siteid
+        self._station_or_site_name = sitename
+        self._aq_type = aq_type
+        self._device_class = device_class
+        self._unit_of_measurement = unit_of_measurement
+        self._state_class = state_class
+        self._display_precision = display_precision
+        self._icon = icon
+        self._siteid = siteid
+
+    @property
+    def name(self):
+        sensor_type = self._aq_type.replace("_", " ")
+        return f"{self._station_or_site_name} {sensor_type}"
+
+    @property
+    def unique_id(self):
+        return f"{DOMAIN}_{self._station_or_site_id}_{self._aq_type.replace(' ', '_')}"
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {(DOMAIN, self._station_or_site_id)},
+            "name": (
+                f"TWAQ Monitor - {self._station_or_site_name}"
+                f"({self._station_or_site_id})"
+            ),
+            "manufacturer": "Taiwan Ministry of Environment Data Open Platform",
+            "model": "TaiwanAQM",
+        }
+
+
+def build_legacy(coordinator, site_ids):
+    return [
+        LegacySiteSensor(
+            coordinator,
+            site_id,
+            f"Site {site_id}",
+            aq_type,
+            config["device_class"],
+            config["unit"],
+            config["state_class"],
+            config["display_precision"],
+            config["icon"],
+        )
+        for site_id in site_ids
+        for aq_type, config in SENSOR_INFO.items()
+        if aq_type not in ("temperature", "humidity")
+    ]
+
+
+def build_shared(coordinator, site_ids):
+    return [
+        SiteSensor(coordinator, site_id, f"Site {site_id}", description)
+        for site_id in site_ids
+        for description in SITE_SENSOR_DESCRIPTIONS
+    ]
+
+
+def setup(build, coordinator, site_ids):
+    """建立實體並讀取加入平台時會用到的識別資料"""
+    entities = build(coordinator, site_ids)
+    # Home Assistant 加入實體時會讀取並保存這些欄位
+    identity = [
+        (entity.name, entity.unique_id, entity.device_info) for entity in entities
+    ]
+    return entities, identity
+
+
+def measure(build, site_ids):
+    """回傳實體數、記憶體用量 (KiB) 與建立時間中位數 (毫秒)"""
+    coordinator = FakeCoordinator()
+    gc.collect()
+    tracemalloc.start()
+    entities, identity = setup(build, coordinator, site_ids)
+    memory = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    count = len(entities)
+    del entities, identity
+
+    timings = []
+    for _ in range(ROUNDS):
+        gc.collect()
+        start = time.perf_counter()
+        setup(build, coordinator, site_ids)
+        timings.append((time.perf_counter() - start) * 1000)
+    return count, memory, sorted(timings)[ROUNDS // 2]
+
+
+def main():
+    print(f"{'sites':>6} {'layout':>7} {'entities':>9} {'memory(KiB)':>12} {'setup(ms)':>10}")
+    for sites in (1, 20, 85):
+        site_ids = [str(index + 1) for index in range(sites)]
+        for name, build in (("legacy", build_legacy), ("shared", build_shared)):
+            count, memory, setup = measure(build, site_ids)
+            print(f"{sites:>6} {name:>7} {count:>9} {memory:>12.1f} {setup:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
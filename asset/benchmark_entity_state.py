@@ -0,0 +1,101 @@
+"""
+量測 1,500 個感測器實體的狀態寫入吞吐量
+
+每次狀態寫入時 Home Assistant 會讀取實體的數值、屬性、名稱、unique_id、
+device_info 等欄位。此腳本以模擬的協調器資料建立 85 個測站的 SiteSensor,
+重複讀取這些欄位並計算每秒可完成的狀態寫入次數。
+
+需在已安裝 Home Assistant 的開發環境執行:
+    python asset/benchmark_entity_state.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.taiwan_aqm.models import SITE_FIELDS, SiteRecord  # noqa: E402
+from custom_components.taiwan_aqm.sensor import (  # noqa: E402
+    SITE_SENSOR_DESCRIPTIONS,
+    SiteSensor,
+)
+
+SITES = 85
+ROUNDS = 20
+FIELDS = (
+    "available", "native_value", "extra_state_attributes", "name",
+    "unique_id", "device_info", "device_class", "native_unit_of_measurement",
+    "state_class", "icon",
+)
+
+
+class FakeCoordinator:
+    """只提供實體會用到的協調器欄位"""
+
+    def __init__(self, data):
+        self.data = data
+        self.last_update_success = True
+        self.changed_keys = None
+        self.values = {}
+        self.attributes = {}
+
+    def async_add_listener(self, *args, **kwargs):
+        return lambda: None
+
+
+def build_coordinator():
+    """建立含 85 個測站資料的協調器"""
+    data = {}
+    for index in range(SITES):
+        site_id = str(index + 1)
+        values = tuple(
+            "2024/05/01 12:00:00" if field == "publishtime"
+            else "良好" if field == "status"
+            else "" if field == "pollutant"
+            else float(index % 50)
+            for field in SITE_FIELDS
+        )
+        data[site_id] = SiteRecord(site_id, values)
+
+    coordinator = FakeCoordinator(data)
+    # 新版協調器會預先建立數值與屬性快照
+    for site_id, record in data.items():
+        coordinator.attributes[site_id] = {
+            "siteID": site_id,
+            "longitude": record.get("longitude", "unknown"),
+            "latitude": record.get("latitude", "unknown"),
+        }
+        for field, value in zip(SITE_FIELDS, record.to_json()):
+            if value is not None and value != "":
+                coordinator.values[(site_id, field)] = value
+    return coordinator
+
+
+def build_entities(coordinator):
+    """為每個測站建立所有測站感測器"""
+    return [
+        SiteSensor(coordinator, site_id, f"Site {site_id}", description)
+        for site_id in coordinator.data
+        for description in SITE_SENSOR_DESCRIPTIONS
+    ]
+
+
+def main():
+    coordinator = build_coordinator()
+    entities = build_entities(coordinator)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for entity in entities:
+            for field in FIELDS:
+                getattr(entity, field)
+    elapsed = time.perf_counter() - start
+
+    writes = len(entities) * ROUNDS
+    print(f"entities: {len(entities)}")
+    print(f"per write: {elapsed / writes * 1e6:.2f} µs")
+    print(f"throughput: {writes / elapsed:,.0f} writes/s")
+
+
+if __name__ == "__main__":
+    main()
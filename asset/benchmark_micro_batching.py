@@ -0,0 +1,143 @@
+"""
+比較微型感測器單一查詢與分批並行查詢的延遲與成功率
+
+直接呼叫整合的 MicroSensorCoordinator._get_data, 並以 httpx 的
+MockTransport 模擬 colife SensorThings API:
+- 每個請求加入隨機延遲
+- URL 超過長度上限時回傳 414
+- 依比例隨機回傳 503
+
+single 模式以單一批次查詢全部站點, batched 模式使用整合預設的
+MICRO_BATCH_SIZE 與 MICRO_MAX_CONCURRENCY。每輪建立新的協調器,
+因此都會執行完整的 Things 查詢。
+
+需在已安裝 Home Assistant 的開發環境執行:
+    python asset/benchmark_micro_batching.py
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+from types import SimpleNamespace
+from typing import Dict, List
+from urllib.parse import unquote
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.taiwan_aqm.const import (  # noqa: E402
+    MICRO_BATCH_SIZE,
+    MICRO_MAX_CONCURRENCY,
+)
+from custom_components.taiwan_aqm.coordinator import (  # noqa: E402
+    MicroSensorCoordinator,
+)
+
+MAX_URL_LENGTH = 8192
+FAILURE_RATE = 0.02
+LATENCY_RANGE = (0.05, 0.15)
+ROUNDS = 10
+STATION_RE = re.compile(r"stationID eq '([^']+)'")
+PHENOMENON_TIME = "2024-05-01T06:00:00.000Z"
+
+
+async def handle(request: httpx.Request) -> httpx.Response:
+    """模擬 colife Things 端點"""
+    await asyncio.sleep(random.uniform(*LATENCY_RANGE))
+    url = str(request.url)
+    if len(url) > MAX_URL_LENGTH:
+        return httpx.Response(414)
+    if random.random() < FAILURE_RATE:
+        return httpx.Response(503)
+
+    station_ids = STATION_RE.findall(unquote(url))
+    body = {
+        "@iot.count": len(station_ids),
+        "value": [
+            {
+                "@iot.id": index,
+                "properties": {"stationID": station_id},
+                "Locations": [],
+                "Datastreams": [
+                    {
+                        "@iot.id": index * 10,
+                        "name": "PM2.5",
+                        "Observations": [
+                            {"result": 12.3, "phenomenonTime": PHENOMENON_TIME}
+                        ],
+                    }
+                ],
+            }
+            for index, station_id in enumerate(station_ids)
+        ],
+    }
+    return httpx.Response(200, content=json.dumps(body).encode())
+
+
+async def fetch(hass, client, station_ids: List[str], batch_size, concurrency) -> int:
+    """以新的協調器抓取一次, 回傳取得資料的站點數"""
+    coordinator = MicroSensorCoordinator(
+        hass,
+        SimpleNamespace(entry_id="benchmark", async_on_unload=lambda func: None),
+        station_ids,
+        batch_size=batch_size,
+        max_concurrency=concurrency,
+    )
+    coordinator.client = client
+    try:
+        return len(await coordinator._get_data())
+    except Exception:
+        # 所有批次都失敗
+        return 0
+
+
+async def measure(hass, client, station_ids, batch_size, concurrency) -> Dict:
+    """統計延遲中位數與站點成功率"""
+    latencies = []
+    found = 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        found += await fetch(hass, client, station_ids, batch_size, concurrency)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "latency_ms": statistics.median(latencies),
+        "success": found / (len(station_ids) * ROUNDS),
+    }
+
+
+async def main():
+    hass = HomeAssistant(tempfile.mkdtemp())
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+
+    print(f"{'stations':>9} {'mode':>8} {'latency(ms)':>12} {'success':>8}")
+    try:
+        for count in (10, 100, 500):
+            station_ids = [str(7480450000 + i) for i in range(count)]
+            modes = (
+                ("single", count, 1),
+                ("batched", MICRO_BATCH_SIZE, MICRO_MAX_CONCURRENCY),
+            )
+            for name, batch_size, concurrency in modes:
+                result = await measure(
+                    hass, client, station_ids, batch_size, concurrency
+                )
+                print(
+                    f"{count:>9} {name:>8} {result['latency_ms']:>12.1f} "
+                    f"{result['success']:>8.1%}"
+                )
+    finally:
+        await client.aclose()
+        await hass.async_stop(force=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+量測微型感測器 JSON 解碼與解析對事件迴圈的阻塞時間
+
+以合成的 SensorThings 回應, 直接呼叫整合的
+MicroSensorCoordinator._decode_and_parse 搭配 _parse_thing_data
+(完整查詢) 與 _parse_observations (增量查詢), 比較兩種做法:
+- inline: 直接在事件迴圈上解碼與解析
+- executor: 交由執行緒池處理 (整合的做法)
+輸出事件迴圈最大延遲, 可用來檢查效能退化。
+
+需在已安裝 Home Assistant 的開發環境執行:
+    python asset/benchmark_micro_loop_block.py [stations]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.taiwan_aqm import parser  # noqa: E402
+from custom_components.taiwan_aqm.coordinator import (  # noqa: E402
+    MicroSensorCoordinator,
+)
+
+TICK = 0.001
+NAMES = ("PM2.5", "PM10", "Temperature", "Humidity", "CO", "O3", "NO2", "TVOC", "Voltage")
+PHENOMENON_TIME = "2024-05-01T06:00:00.000Z"
+
+
+def station_id(thing_id: int) -> str:
+    """合成的站點 ID"""
+    return str(7480450000 + thing_id)
+
+
+def build_things_payload(stations: int) -> bytes:
+    """產生與 colife Things 查詢相同結構的回應"""
+    return json.dumps({
+        "@iot.count": stations,
+        "value": [
+            {
+                "@iot.id": thing_id,
+                "properties": {
+                    "stationID": station_id(thing_id),
+                    "Description": "智慧城鄉空品微型感測器",
+                    "areaType": "社區",
+                    "areaDescription": "某某里",
+                    "authority": "環境部",
+                },
+                "Locations": [{"location": {"coordinates": [121.5, 25.0]}}],
+                "Datastreams": [
+                    {
+                        "@iot.id": thing_id * 10 + index,
+                        "name": name,
+                        "Observations": [
+                            {"result": 12.3, "phenomenonTime": PHENOMENON_TIME}
+                        ],
+                    }
+                    for index, name in enumerate(NAMES)
+                ],
+            }
+            for thing_id in range(stations)
+        ],
+    }).encode()
+
+
+def build_observations_payload(stations: int) -> bytes:
+    """產生與 colife Datastreams 增量查詢相同結構的回應"""
+    return json.dumps({
+        "value": [
+            {
+                "@iot.id": thing_id * 10 + index,
+                "Observations": [
+                    {"result": 12.3, "phenomenonTime": PHENOMENON_TIME}
+                ],
+            }
+            for thing_id in range(stations)
+            for index in range(len(NAMES))
+        ],
+    }).encode()
+
+
+async def max_loop_lag(work) -> float:
+    """執行工作期間事件迴圈的最大延遲 (毫秒)"""
+    lag = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal lag
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lag = max(lag, time.perf_counter() - start - TICK)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 5)
+    await work()
+    running = False
+    await task
+    return lag * 1000
+
+
+async def main():
+    stations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    loop = asyncio.get_running_loop()
+
+    # 解析只需要設定的站點 ID, 不需建立完整的協調器
+    coordinator = MicroSensorCoordinator.__new__(MicroSensorCoordinator)
+    coordinator.station_ids = [station_id(i) for i in range(stations)]
+    decode_and_parse = MicroSensorCoordinator._decode_and_parse
+
+    cases = (
+        ("things", build_things_payload(stations), coordinator._parse_thing_data),
+        (
+            "observations",
+            build_observations_payload(stations),
+            MicroSensorCoordinator._parse_observations,
+        ),
+    )
+
+    print(f"stations: {stations}, orjson: {parser.orjson is not None}")
+    for name, content, parse in cases:
+        async def inline():
+            decode_and_parse(content, parse)
+
+        async def executor():
+            await loop.run_in_executor(None, decode_and_parse, content, parse)
+
+        print(f"{name} payload: {len(content)} bytes")
+        for mode, work in (("inline", inline), ("executor", executor)):
+            print(f"{mode:>16}: max loop lag {await max_loop_lag(work):.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
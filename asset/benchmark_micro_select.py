@@ -0,0 +1,68 @@
+"""
+比較微型感測器查詢加上 $select 前後的回應大小與解析時間
+
+使用方式:
+    python asset/benchmark_micro_select.py 7480451814 7480451815 ...
+"""
+import json
+import statistics
+import sys
+import time
+
+from typing import Dict, List
+
+import requests
+
+BASE_URL = "https://sta.colife.org.tw/STA_AirQuality_EPAIoT/v1.0"
+FILTER_PARAMS = "properties/stationID eq '{stationID}'"
+FULL_QUERY = (
+    "&$expand=Locations,"
+    "Datastreams($expand=Observations($orderby=phenomenonTime desc;$top=1))"
+)
+SELECT_QUERY = (
+    "&$select=id,properties"
+    "&$expand=Locations($select=location),"
+    "Datastreams($select=id,name;"
+    "$expand=Observations($select=result,phenomenonTime;"
+    "$orderby=phenomenonTime desc;$top=1))"
+)
+ROUNDS = 20
+
+
+def build_url(station_ids: List[str], query: str) -> str:
+    """組出查詢 URL"""
+    filter_params = " or ".join(
+        FILTER_PARAMS.format(stationID=station_id) for station_id in station_ids
+    )
+    return f"{BASE_URL}/Things?$filter=({filter_params}){query}"
+
+
+def measure(url: str) -> Dict:
+    """下載一次並重複量測 JSON 解析時間"""
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    content = response.content
+
+    parse_times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        json.loads(content)
+        parse_times.append((time.perf_counter() - start) * 1000)
+
+    return {"bytes": len(content), "parse_ms": statistics.median(parse_times)}
+
+
+def main():
+    station_ids = sys.argv[1:]
+    if not station_ids:
+        print("❌ 請提供至少一個 Station ID", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{'query':>8} {'bytes':>10} {'parse(ms)':>10}")
+    for name, query in (("full", FULL_QUERY), ("select", SELECT_QUERY)):
+        result = measure(build_url(station_ids, query))
+        print(f"{name:>8} {result['bytes']:>10} {result['parse_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+比較測站 API 完整下載與伺服器端篩選的傳輸量與延遲
+
+使用方式:
+    MOENV_API_KEY=<your key> python asset/benchmark_site_api.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+from typing import Dict, List
+
+import requests
+
+API_URL = "https://data.moenv.gov.tw/api/v2/aqx_p_432"
+EXPECTED_FILE = "asset/expected_sites.json"
+FIELDS = (
+    "aqi,pollutant,status,publishtime,so2,so2_avg,co,co_8hr,o3,o3_8hr,no2,nox,no,"
+    "pm10,pm10_avg,pm2.5,pm2.5_avg,wind_speed,wind_direc,longitude,latitude,siteid"
+)
+PAGE_LIMIT = 100
+ROUNDS = 5
+
+
+def load_site_ids() -> List[str]:
+    """載入所有站點 ID"""
+    with open(EXPECTED_FILE, 'r', encoding='utf-8') as f:
+        return [str(site['siteid']) for site in json.load(f)]
+
+
+def fetch_full(api_key: str) -> int:
+    """完整下載, 回傳傳輸位元組數"""
+    params = {"language": "zh", "api_key": api_key, "format": "CSV"}
+    response = requests.get(API_URL, params=params, timeout=30)
+    response.raise_for_status()
+    return len(response.content)
+
+
+def fetch_filtered(api_key: str, site_ids: List[str]) -> int:
+    """伺服器端篩選並分頁下載, 回傳傳輸位元組數"""
+    total = 0
+    offset = 0
+    while True:
+        params = {
+            "language": "zh",
+            "api_key": api_key,
+            "format": "CSV",
+            "filters": f"siteid,EQ,{'|'.join(site_ids)}",
+            "fields": FIELDS,
+            "limit": PAGE_LIMIT,
+            "offset": offset,
+        }
+        response = requests.get(API_URL, params=params, timeout=30)
+        response.raise_for_status()
+        total += len(response.content)
+        rows = max(len(response.content.splitlines()) - 1, 0)
+        if rows < PAGE_LIMIT:
+            return total
+        offset += PAGE_LIMIT
+
+
+def measure(func, *args) -> Dict:
+    """重複執行並統計延遲中位數"""
+    latencies = []
+    size = 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        size = func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"bytes": size, "latency_ms": statistics.median(latencies)}
+
+
+def main():
+    api_key = os.environ.get("MOENV_API_KEY")
+    if not api_key:
+        print("❌ 請設定 MOENV_API_KEY 環境變數", file=sys.stderr)
+        sys.exit(1)
+
+    site_ids = load_site_ids()
+    full = measure(fetch_full, api_key)
+
+    print(f"{'sites':>6} {'mode':>9} {'bytes':>9} {'latency(ms)':>12}")
+    for count in (1, 10, len(site_ids)):
+        filtered = measure(fetch_filtered, api_key, site_ids[:count])
+        print(f"{count:>6} {'full':>9} {full['bytes']:>9} {full['latency_ms']:>12.1f}")
+        print(
+            f"{count:>6} {'filtered':>9} {filtered['bytes']:>9} "
+            f"{filtered['latency_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
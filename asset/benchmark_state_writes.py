@@ -0,0 +1,125 @@
+"""
+估算每小時的實體狀態寫入次數 (state_changed 事件)
+
+以模擬資料比較兩種方式:
+- all: 每次協調器通知時所有實體都寫入狀態
+- diff: 只寫入 (ID, 感測器類型) 有變動的實體
+
+模擬 50 個測站 (每小時發布一次) 與 50 個微型感測器 (每 2 分鐘輪詢,
+每 5-10 分鐘回報一次)。需在已安裝 Home Assistant 的開發環境執行:
+    python asset/benchmark_state_writes.py
+"""
+import os
+import random
+import sys
+
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.taiwan_aqm.coordinator import (  # noqa: E402
+    MicroSensorCoordinator,
+    SiteCoordinator,
+)
+from custom_components.taiwan_aqm.models import SITE_FIELDS, SiteRecord  # noqa: E402
+
+SITES = 50
+STATIONS = 50
+HOURS = 24
+MICRO_TYPES = ("pm2.5", "temperature", "humidity")
+SITE_TYPES = tuple(f for f in SITE_FIELDS if f not in ("longitude", "latitude"))
+TEXT_VALUES = {
+    "pollutant": ("", "細懸浮微粒", "臭氧八小時"),
+    "status": ("良好", "普通"),
+}
+
+
+def site_records(previous, hour):
+    """產生下一小時的測站資料, 數值以隨機漫步變化"""
+    records = {}
+    for index in range(SITES):
+        site_id = str(index + 1)
+        old = previous.get(site_id)
+        values = []
+        for field in SITE_FIELDS:
+            last = old.get(field) if old else None
+            if field == "publishtime":
+                values.append(f"2024/05/01 {hour:02d}:00:00")
+            elif field in TEXT_VALUES:
+                if last is None or random.random() < 0.1:
+                    last = random.choice(TEXT_VALUES[field])
+                values.append(last)
+            elif field in ("longitude", "latitude"):
+                values.append(last if last is not None else random.uniform(120, 122))
+            else:
+                base = last if last is not None else random.randint(0, 50)
+                values.append(float(max(0, round(base + random.choice((-1, 0, 0, 1))))))
+        records[site_id] = SiteRecord(site_id, tuple(values))
+    return records
+
+
+def simulate_sites():
+    """回傳測站在兩種方式下的每小時寫入次數"""
+    all_writes = diff_writes = 0
+    previous = {}
+    for hour in range(HOURS):
+        data = site_records(previous, hour)
+        if previous:
+            changed = set(SiteCoordinator._changed_keys(None, previous, data))
+            diff_writes += sum(
+                1 for site_id in data for t in SITE_TYPES if (site_id, t) in changed
+            )
+            all_writes += len(data) * len(SITE_TYPES)
+        previous = data
+    return all_writes / (HOURS - 1), diff_writes / (HOURS - 1)
+
+
+def simulate_micro():
+    """回傳微型感測器在兩種方式下的每小時寫入次數"""
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    periods = {
+        str(index): timedelta(minutes=random.choice((5, 10)))
+        for index in range(STATIONS)
+    }
+    all_writes = diff_writes = 0
+    previous = None
+    polls = HOURS * 30
+    for poll in range(polls):
+        now = start + timedelta(minutes=2 * poll)
+        data = {}
+        for station_id, period in periods.items():
+            # 最近一次回報時間
+            observed = start + period * int((now - start) / period)
+            random.seed(f"{station_id}-{observed}")
+            station = {"stationID": station_id, "longitude": 121.0, "latitude": 25.0}
+            for sensor_type in MICRO_TYPES:
+                station[sensor_type] = random.randint(0, 40)
+                station[f"{sensor_type}_time"] = observed
+            data[station_id] = station
+        if previous is not None:
+            changed = set(MicroSensorCoordinator._changed_keys(None, previous, data))
+            diff_writes += sum(
+                1 for station_id in data for t in MICRO_TYPES
+                if (station_id, t) in changed
+            )
+            all_writes += len(data) * len(MICRO_TYPES)
+        previous = data
+    return all_writes / HOURS, diff_writes / HOURS
+
+
+def main():
+    random.seed(0)
+    print(f"{'source':>12} {'entities':>9} {'all/h':>8} {'diff/h':>8}")
+    site_all, site_diff = simulate_sites()
+    print(
+        f"{'site':>12} {SITES * len(SITE_TYPES):>9} {site_all:>8.0f} {site_diff:>8.0f}"
+    )
+    micro_all, micro_diff = simulate_micro()
+    print(
+        f"{'micro':>12} {STATIONS * len(MICRO_TYPES):>9} "
+        f"{micro_all:>8.0f} {micro_diff:>8.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
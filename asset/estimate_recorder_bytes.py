@@ -0,0 +1,113 @@
+"""
+估算 Home Assistant 記錄器每日寫入的位元組數
+
+比較預設設定與記錄器友善設定:
+- default: 靜態屬性寫入記錄器, 啟用文字感測器
+- friendly: 靜態屬性標記為 _unrecorded_attributes, 靜態資料顯示於裝置,
+  停用文字感測器
+
+估算方式:
+- 每次狀態寫入新增一筆 states 資料 (固定開銷 + 狀態字串)
+- 屬性 JSON 與之前不同時才新增一筆 state_attributes 資料
+  (記錄器以雜湊去除重複的屬性)
+
+使用方式:
+    python asset/estimate_recorder_bytes.py
+"""
+import json
+
+SITES = 50
+STATIONS = 50
+# 每筆資料的固定開銷 (欄位、時間戳記與索引) 的概略值
+STATE_ROW_BYTES = 120
+ATTRIBUTES_ROW_BYTES = 50
+# 測站每小時發布一次, 微型感測器平均每 7.5 分鐘回報一次
+SITE_WRITES_PER_DAY = 24
+MICRO_WRITES_PER_DAY = 24 * 8
+
+SITE_NUMERIC = (
+    "aqi", "so2", "so2_avg", "co", "co_8hr", "o3", "o3_8hr", "no2", "nox", "no",
+    "pm10", "pm10_avg", "pm2.5", "pm2.5_avg", "wind_speed", "wind_direc",
+)
+SITE_TEXT = {"pollutant": "細懸浮微粒", "status": "普通", "publishtime": "2024/05/01 12:00"}
+MICRO_TYPES = ("pm2.5", "temperature", "humidity")
+
+SITE_ATTRIBUTES = {"siteID": "12", "longitude": 121.526528, "latitude": 25.062361}
+SITE_UNRECORDED = {"siteID", "longitude", "latitude"}
+MICRO_ATTRIBUTES = {
+    "thingID": 12345,
+    "stationID": "10288445428",
+    "Description": "智慧城鄉空品微型感測器-10288445428",
+    "areaType": "一般社區",
+    "areaDescription": "臺北市中山區中山里",
+    "authority": "環境部",
+    "longitude": 121.52,
+    "latitude": 25.06,
+    "UpdateTime": "2024-05-01 12:07:00",
+}
+MICRO_UNRECORDED = {
+    "thingID", "stationID", "Description", "areaType", "areaDescription",
+    "authority", "longitude", "latitude",
+}
+MICRO_DEVICE_KEYS = {"thingID", "stationID", "Description", "authority"}
+# 每個感測器都有的標準屬性
+STANDARD_ATTRIBUTES = {
+    "state_class": "measurement",
+    "unit_of_measurement": "μg/m³",
+    "device_class": "pm25",
+    "friendly_name": "Micro Sensor(10288445428) pm2.5",
+}
+
+
+def attributes_bytes(attributes, unrecorded):
+    """回傳寫入記錄器的屬性 JSON 大小"""
+    recorded = {
+        key: value for key, value in {**STANDARD_ATTRIBUTES, **attributes}.items()
+        if key not in unrecorded
+    }
+    return ATTRIBUTES_ROW_BYTES + len(json.dumps(recorded, ensure_ascii=False).encode())
+
+
+def site_bytes(friendly):
+    """測站感測器每日寫入位元組數"""
+    sensors = {aq_type: "35.0" for aq_type in SITE_NUMERIC}
+    if not friendly:
+        sensors.update(SITE_TEXT)
+
+    total = 0
+    for state in sensors.values():
+        total += SITE_WRITES_PER_DAY * (STATE_ROW_BYTES + len(state.encode()))
+        # 屬性固定不變, 每個實體只寫入一次
+        attributes = dict(SITE_ATTRIBUTES)
+        if friendly:
+            attributes.pop("siteID")
+        total += attributes_bytes(attributes, SITE_UNRECORDED if friendly else set())
+    return total * SITES
+
+
+def micro_bytes(friendly):
+    """微型感測器每日寫入位元組數"""
+    attributes = dict(MICRO_ATTRIBUTES)
+    if friendly:
+        for key in MICRO_DEVICE_KEYS:
+            attributes.pop(key)
+    unrecorded = MICRO_UNRECORDED if friendly else set()
+
+    # UpdateTime 每次回報都不同, 每次寫入都會新增屬性資料
+    per_write = STATE_ROW_BYTES + len("12.5") + attributes_bytes(attributes, unrecorded)
+    return per_write * MICRO_WRITES_PER_DAY * len(MICRO_TYPES) * STATIONS
+
+
+def main():
+    print(f"{'source':>8} {'default(KiB/day)':>17} {'friendly(KiB/day)':>18}")
+    totals = [0, 0]
+    for name, estimate in (("site", site_bytes), ("micro", micro_bytes)):
+        default, friendly = estimate(False), estimate(True)
+        totals[0] += default
+        totals[1] += friendly
+        print(f"{name:>8} {default / 1024:>17.0f} {friendly / 1024:>18.0f}")
+    print(f"{'total':>8} {totals[0] / 1024:>17.0f} {totals[1] / 1024:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+產生整合使用的測站目錄 custom_components/taiwan_aqm/sites.json
+
+以 asset/expected_sites.json 的測站清單為基礎, 並從環境部 API 的 CSV
+取得各測站的經緯度。每筆資料的格式為:
+    [siteid, sitename, county, longitude, latitude]
+
+無法取得座標的測站保留 null, 整合會在執行時從 API 資料補上。
+
+使用方式:
+    python asset/generate_site_catalog.py --api-key <API_KEY>
+    python asset/generate_site_catalog.py --csv aqx_p_432.csv
+    python asset/generate_site_catalog.py --offline
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+ASSET_DIR = os.path.dirname(__file__)
+EXPECTED_FILE = os.path.join(ASSET_DIR, "expected_sites.json")
+OUTPUT_FILE = os.path.join(
+    ASSET_DIR, "..", "custom_components", "taiwan_aqm", "sites.json"
+)
+API_URL = "https://data.moenv.gov.tw/api/v2/aqx_p_432"
+
+
+def parse_coordinates(lines):
+    """從 CSV 內容取得 {siteid: (longitude, latitude)}"""
+    coordinates = {}
+    for row in csv.DictReader(lines):
+        siteid = (row.get("siteid") or "").strip()
+        try:
+            longitude = round(float(row["longitude"]), 6)
+            latitude = round(float(row["latitude"]), 6)
+        except (KeyError, TypeError, ValueError):
+            continue
+        if siteid:
+            coordinates.setdefault(siteid, (longitude, latitude))
+    return coordinates
+
+
+def fetch_coordinates(api_key):
+    """從 API 下載所有測站的座標"""
+    import requests
+
+    response = requests.get(
+        API_URL,
+        params={
+            "api_key": api_key,
+            "format": "CSV",
+            "limit": 1000,
+            "fields": "siteid,longitude,latitude",
+        },
+        timeout=30,
+    )
+    response.raise_for_status()
+    return parse_coordinates(response.content.decode("utf-8-sig").splitlines())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--api-key", default=os.environ.get("MOENV_API_KEY"))
+    parser.add_argument("--csv", help="已下載的 aqx_p_432 CSV 檔案")
+    parser.add_argument("--offline", action="store_true", help="不取得座標")
+    args = parser.parse_args()
+
+    with open(EXPECTED_FILE, encoding="utf-8") as file:
+        expected = json.load(file)
+
+    coordinates = {}
+    if args.csv:
+        with open(args.csv, encoding="utf-8-sig") as file:
+            coordinates = parse_coordinates(file)
+    elif not args.offline:
+        if not args.api_key:
+            sys.exit("需要 --api-key, --csv 或 --offline")
+        coordinates = fetch_coordinates(args.api_key)
+
+    sites = []
+    for site in sorted(expected, key=lambda site: int(site["siteid"])):
+        longitude, latitude = coordinates.get(site["siteid"], (None, None))
+        sites.append(
+            [site["siteid"], site["sitename"], site["county"], longitude, latitude]
+        )
+
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as file:
+        file.write("[\n")
+        file.write(",\n".join(json.dumps(site, ensure_ascii=False) for site in sites))
+        file.write("\n]\n")
+
+    located = sum(1 for site in sites if site[3] is not None)
+    print(f"sites: {len(sites)}, with coordinates: {located}")
+
+
+if __name__ == "__main__":
+    main()
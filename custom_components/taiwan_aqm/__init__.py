@@ -1,19 +1,29 @@
+import asyncio
+import functools
 import logging
 
 from homeassistant.core import callback
-from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState, ConfigSubentry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.debounce import Debouncer
 
-from .coordinator import SiteCoordinator, MicroSensorCoordinator
+from .coordinator import (
+    baseCoordinator,
+    SiteCoordinator,
+    MicroSensorCoordinator,
+    async_remove_snapshots,
+)
+from .sensor import async_add_subentry_entities
 from .const import (
     DOMAIN,
     CONF_API_KEY,
+    CONF_METADATA_ON_DEVICE,
+    CONF_SITE_SERVER_FILTER,
     CONF_SITEID,
     CONF_STATION_ID,
     CONF_THING_ID,
@@ -21,8 +31,12 @@ from .const import (
     SITE_COORDINATOR,
     MICRO_COORDINATOR,
     MICRO_SENSOR_IDS,
-    SITE_UPDATE_TASK,
+    ENTRY_SETTINGS,
+    KNOWN_SUBENTRIES,
     PLATFORM,
+    RECONCILE_COOLDOWN,
+    RECONCILE_DEBOUNCER,
+    SETUP_DEADLINE,
 )
 
 CONFIG_SCHEMA = cv.removed(DOMAIN, raise_if_present=True)
@@ -63,10 +77,121 @@ def _get_micro_sensor_ids_from_entry(entry: ConfigEntry) -> list[str]:
     ]
 
 
-async def _async_setup_subentries(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up subentries for the config entry.
+async def _async_first_refresh(
+    hass: HomeAssistant, entry: ConfigEntry, coordinators: list[baseCoordinator]
+) -> None:
+    """Run the first refresh of all coordinators concurrently.
+
+    Coordinators with a stored snapshot refresh in the background. The
+    others are awaited together until ``SETUP_DEADLINE``; a refresh that is
+    still running after the deadline keeps going in the background and
+    only its own entities wait for it. Setup fails only when no
+    coordinator has any data.
+    """
+    tasks: dict[asyncio.Task, baseCoordinator] = {}
+    restored = 0
+    for coordinator in coordinators:
+        if await coordinator.async_restore_snapshot():
+            restored += 1
+            # 有快取資料時於背景刷新, 不阻塞啟動
+            entry.async_create_background_task(
+                hass,
+                coordinator.async_refresh(),
+                f"{coordinator.name}_first_refresh",
+            )
+        else:
+            task = entry.async_create_background_task(
+                hass,
+                (
+                    coordinator.async_config_entry_first_refresh()
+                    if entry.state is ConfigEntryState.SETUP_IN_PROGRESS
+                    # 設定完成後新增的協調器
+                    else coordinator.async_refresh()
+                ),
+                f"{coordinator.name}_first_refresh",
+            )
+            task.add_done_callback(_log_first_refresh)
+            tasks[task] = coordinator
+
+    if not tasks:
+        return
+
+    done, pending = await asyncio.wait(
+        tasks, timeout=SETUP_DEADLINE.total_seconds()
+    )
+    for task in pending:
+        _LOGGER.warning(
+            "%s first refresh exceeded the setup deadline, continuing in background",
+            tasks[task].name,
+        )
+
+    failed = []
+    for task in done:
+        if task.cancelled():
+            failed.append(ConfigEntryNotReady(f"{tasks[task].name} refresh cancelled"))
+            continue
+        if (error := task.exception()) is None:
+            continue
+        if isinstance(error, ConfigEntryAuthFailed):
+            raise error
+        _LOGGER.warning("%s first refresh failed: %s", tasks[task].name, error)
+        failed.append(error)
+
+    # 沒有任何協調器有資料時才讓整個 entry 稍後重試, 快取還原視為成功
+    if failed and len(failed) == len(tasks) and not restored:
+        raise ConfigEntryNotReady(str(failed[0])) from failed[0]
+
+
+@callback
+def _log_first_refresh(task: asyncio.Task) -> None:
+    """Log a first refresh that failed after setup stopped waiting for it."""
+    if not task.cancelled() and (error := task.exception()) is not None:
+        _LOGGER.debug("First refresh %s failed: %s", task.get_name(), error)
+
+
+@callback
+def _async_create_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, key: str, ids: list[str]
+) -> baseCoordinator:
+    """Create the Site or Micro Sensor coordinator."""
+    metadata_on_device = entry.options.get(CONF_METADATA_ON_DEVICE, False)
+    if key == SITE_COORDINATOR:
+        return SiteCoordinator(
+            hass,
+            entry,
+            entry.data.get(CONF_API_KEY),
+            ids,
+            server_filter=entry.options.get(CONF_SITE_SERVER_FILTER, False),
+            metadata_on_device=metadata_on_device,
+        )
+    return MicroSensorCoordinator(
+        hass, entry, ids, metadata_on_device=metadata_on_device
+    )
+
 
-    Returns True if platforms were loaded, False otherwise.
+@callback
+def _async_remove_stale_registry_entries(
+    hass: HomeAssistant, entry: ConfigEntry, removed_ids: set[str]
+) -> None:
+    """Remove entities and devices of subentries that no longer exist."""
+    entity_reg = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(entity_reg, entry.entry_id):
+        if entity.config_subentry_id not in entry.subentries:
+            entity_reg.async_remove(entity.entity_id)
+
+    identifiers = {(DOMAIN, data_id) for data_id in removed_ids}
+    device_reg = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_reg, entry.entry_id):
+        if device.identifiers & identifiers:
+            device_reg.async_remove_device(device.id)
+
+
+async def _async_reconcile(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Bring coordinators and entities in line with the entry's subentries.
+
+    Coordinators are created, updated in place or shut down to match the
+    configured sites and stations, and only the entities of added or
+    removed subentries are touched.
     """
     config_data = hass.data[DOMAIN][entry.entry_id]
 
@@ -74,53 +199,54 @@ async def _async_setup_subentries(hass: HomeAssistant, entry: ConfigEntry) -> bo
     site_ids = _get_site_ids_from_entry(entry)
     micro_sensor_ids = _get_micro_sensor_ids_from_entry(entry)
 
-    # 創建 coordinators
-    if site_ids:
-        api_key = entry.data.get(CONF_API_KEY)
-        site_coordinator = SiteCoordinator(hass, api_key, site_ids)
-        # 設置定時刷新任務 (僅標準站點)
-        async def site_force_refresh_task(*args):
-            await site_coordinator.async_refresh()
-            timestamp = args[0].strftime("%Y-%m-%d %H:%M:%S %Z")
-            _LOGGER.debug("Force Refresh Success at: %s", timestamp)
-
-        site_update_task = async_track_time_change(
-            hass, site_force_refresh_task, minute=10, second=0
-        )
-        config_data.update(
-            {
-                SITE_COORDINATOR: site_coordinator,
-                SITE_UPDATE_TASK: site_update_task,
-            }
-        )
-        # 初始刷新
-        await site_coordinator.async_config_entry_first_refresh()
-
-    if micro_sensor_ids:
-        micro_coordinator = MicroSensorCoordinator(hass, micro_sensor_ids)
-        config_data.update(
-            {
-                MICRO_COORDINATOR: micro_coordinator,
-                MICRO_SENSOR_IDS: micro_sensor_ids,
-            }
-        )
-        # 初始刷新
-        await micro_coordinator.async_config_entry_first_refresh()
-
-    # 初始化感測器平台
-    platforms_loaded = False
-    if site_ids or micro_sensor_ids:
-        await hass.config_entries.async_forward_entry_setups(entry, PLATFORM)
-        platforms_loaded = True
+    new_coordinators: list[baseCoordinator] = []
+    removed_ids: set[str] = set()
+    for key, ids in (
+        (SITE_COORDINATOR, site_ids),
+        (MICRO_COORDINATOR, micro_sensor_ids),
+    ):
+        coordinator = config_data.get(key)
+        if coordinator is not None:
+            removed_ids.update(set(coordinator.configured_ids) - set(ids))
+
+        if not ids:
+            if coordinator is not None:
+                await coordinator.async_shutdown()
+                # 已無任何 ID 時快照不再需要
+                await coordinator.async_remove_snapshot()
+                config_data.pop(key)
+        elif coordinator is None:
+            config_data[key] = _async_create_coordinator(hass, entry, key, ids)
+            new_coordinators.append(config_data[key])
+        else:
+            coordinator.async_set_configured_ids(ids)
+    config_data[MICRO_SENSOR_IDS] = micro_sensor_ids
+
+    # 兩個 API 互相獨立, 同時進行初始刷新
+    if new_coordinators:
+        await _async_first_refresh(hass, entry, new_coordinators)
+
+    known = config_data[KNOWN_SUBENTRIES]
+    current = set(entry.subentries)
+    if known - current:
+        _async_remove_stale_registry_entries(hass, entry, removed_ids)
+    config_data[KNOWN_SUBENTRIES] = current
+
+    # 初始化感測器平台, 已載入時只加入新的 subentry 實體
+    if not config_data["platforms_loaded"]:
+        if site_ids or micro_sensor_ids:
+            await hass.config_entries.async_forward_entry_setups(entry, PLATFORM)
+            config_data["platforms_loaded"] = True
+    else:
+        for subentry_id in current - known:
+            async_add_subentry_entities(hass, entry, entry.subentries[subentry_id])
 
     _LOGGER.debug(
-            "Setting up Taiwan AQM with sites: %s, micro sensors: %s",
+            "Reconciled Taiwan AQM with sites: %s, micro sensors: %s",
             site_ids,
             micro_sensor_ids,
         )
 
-    return platforms_loaded
-    
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up global services for Taiwan AQM."""
@@ -130,26 +256,54 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Taiwan AQM from a config entry."""
     try:
+        # 連續新增多個 subentry 時只協調一次
+        debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=RECONCILE_COOLDOWN,
+            immediate=False,
+            function=functools.partial(_async_reconcile, hass, entry),
+        )
+        entry.async_on_unload(debouncer.async_cancel)
         hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
             "platforms_loaded": False,
+            KNOWN_SUBENTRIES: set(),
+            ENTRY_SETTINGS: _entry_settings(entry),
+            RECONCILE_DEBOUNCER: debouncer,
         }
-        platforms_loaded = await _async_setup_subentries(hass, entry)
-        hass.data[DOMAIN][entry.entry_id]["platforms_loaded"] = platforms_loaded
+        await _async_reconcile(hass, entry)
         # 註冊更新監聽器
         entry.async_on_unload(entry.add_update_listener(update_listener))
         return True
     except ConfigEntryAuthFailed as e:
         _LOGGER.error("API key authentication failed: %s", e)
         raise
+    except ConfigEntryNotReady:
+        raise
     except Exception as e:
         _LOGGER.error("async_setup_entry error: %s", e)
         return False
 
 
+@callback
+def _entry_settings(entry: ConfigEntry) -> tuple[dict, dict]:
+    """Return the entry data and options that require a reload when changed."""
+    return dict(entry.data), dict(entry.options)
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update listener."""
     try:
-        await hass.config_entries.async_reload(entry.entry_id)
+        config_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        # 選項或 API key 變更時重新載入, 只有 subentry 變更時就地調整
+        if (
+            config_data is None
+            or config_data[ENTRY_SETTINGS] != _entry_settings(entry)
+        ):
+            await hass.config_entries.async_reload(entry.entry_id)
+            return
+
+        await config_data[RECONCILE_DEBOUNCER].async_call()
     except Exception as e:
         _LOGGER.error("update_listener error: %s", e)
 
@@ -166,9 +320,6 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             
             if not unload_ok:
                 return False
-            # 取消定時刷新任務
-            if (unload_task := entry_data.get(SITE_UPDATE_TASK)):
-                unload_task()
 
         # 從 hass.data 中移除 entry 相關數據
         if entry.entry_id in aqm_data:
@@ -185,6 +336,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         return False
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted snapshots when the config entry is deleted."""
+    await async_remove_snapshots(hass, entry.entry_id)
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload the config entry."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,242 @@
+"""Local PM2.5 averages and AQI for micro sensors."""
+from __future__ import annotations
+
+import bisect
+import math
+from datetime import datetime, timedelta
+
+from homeassistant.util.dt import parse_datetime
+
+# 細懸浮微粒 AQI 分級: (濃度下限, 濃度上限, AQI 下限, AQI 上限), 單位 μg/m³
+PM25_BREAKPOINTS = (
+    (0.0, 15.4, 0, 50),
+    (15.5, 35.4, 51, 100),
+    (35.5, 54.4, 101, 150),
+    (54.5, 150.4, 151, 200),
+    (150.5, 250.4, 201, 300),
+    (250.5, 350.4, 301, 400),
+    (350.5, 500.4, 401, 500),
+)
+_UPPER_BOUNDS = tuple(c_high for _, c_high, _, _ in PM25_BREAKPOINTS)
+# 每個分級的線性內插起點與斜率
+_SEGMENTS = tuple(
+    (c_low, aqi_low, (aqi_high - aqi_low) / (c_high - c_low))
+    for c_low, c_high, aqi_low, aqi_high in PM25_BREAKPOINTS
+)
+
+HOUR = timedelta(hours=1)
+# 平均值的時間窗 (小時), 最長的時間窗決定保留的小時數
+WINDOWS = (1, 4, 12, 24)
+# 時間窗內至少要有四分之三的小時有資料
+MIN_COVERAGE = 0.75
+
+
+def pm25_aqi(concentration: float | None) -> int | None:
+    """Return the PM2.5 sub-index AQI of a concentration."""
+    if concentration is None or concentration < 0:
+        return None
+
+    # 濃度取至小數點後一位
+    concentration = math.floor(concentration * 10 + 1e-9) / 10
+    index = bisect.bisect_left(_UPPER_BOUNDS, concentration)
+    if index == len(_SEGMENTS):
+        return PM25_BREAKPOINTS[-1][3]
+
+    c_low, aqi_low, slope = _SEGMENTS[index]
+    return int(aqi_low + slope * (concentration - c_low) + 0.5)
+
+
+class RingBuffer:
+    """Fixed-size window of hourly means with a running sum."""
+
+    __slots__ = ("_values", "_index", "_sum", "_count", "_min_count")
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty window."""
+        self._values: list[float | None] = [None] * size
+        self._index = 0
+        self._sum = 0.0
+        self._count = 0
+        self._min_count = math.ceil(size * MIN_COVERAGE)
+
+    def push(self, value: float | None) -> None:
+        """Add the newest hour, dropping the oldest one."""
+        if (old := self._values[self._index]) is not None:
+            self._sum -= old
+            self._count -= 1
+        self._values[self._index] = value
+        if value is not None:
+            self._sum += value
+            self._count += 1
+        self._index = (self._index + 1) % len(self._values)
+
+    @property
+    def mean(self) -> float | None:
+        """Return the window mean, None when too many hours are missing."""
+        if self._count < self._min_count:
+            return None
+        return self._sum / self._count
+
+    def values(self) -> list[float | None]:
+        """Return the hours from oldest to newest."""
+        return self._values[self._index:] + self._values[:self._index]
+
+
+class StationAverages:
+    """Rolling PM2.5 hourly means of one station.
+
+    Observations are summed into the current clock hour. When an
+    observation from a later hour arrives, or the wall clock passes the
+    hour, the hour's mean is pushed into one ring buffer per window, with
+    None for the hours without data.
+    """
+
+    __slots__ = ("hour", "latest", "_hour_sum", "_hour_count", "_windows")
+
+    def __init__(self) -> None:
+        """Initialize empty windows."""
+        self.hour: datetime | None = None
+        self.latest: datetime | None = None
+        self._hour_sum = 0.0
+        self._hour_count = 0
+        self._windows = {hours: RingBuffer(hours) for hours in WINDOWS}
+
+    def observe(self, observed: datetime, value: float) -> bool:
+        """Add an observation, return True when an hour was completed."""
+        if self.latest is not None and observed <= self.latest:
+            return False
+        self.latest = observed
+
+        closed = False
+        hour = observed.replace(minute=0, second=0, microsecond=0)
+        # 該小時已依時鐘結束, 遲到的觀測值不再計入
+        if self.hour is not None and hour < self.hour:
+            return False
+        if self.hour is not None and hour > self.hour:
+            self._close_hour(hour)
+            closed = True
+        self.hour = hour
+        self._hour_sum += value
+        self._hour_count += 1
+        return closed
+
+    def advance(self, now: datetime) -> None:
+        """Close the hours that ended without a newer observation."""
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        if self.hour is not None and hour > self.hour:
+            self._close_hour(hour)
+            self.hour = hour
+
+    def _close_hour(self, hour: datetime) -> None:
+        """Push the current hour and the missing hours before the new one."""
+        mean = self._hour_sum / self._hour_count if self._hour_count else None
+        missing = min(int((hour - self.hour) / HOUR) - 1, WINDOWS[-1])
+        for window in self._windows.values():
+            window.push(mean)
+            for _ in range(missing):
+                window.push(None)
+        self._hour_sum = 0.0
+        self._hour_count = 0
+
+    def mean(self, hours: int) -> float | None:
+        """Return the mean of the last completed hours of one window."""
+        return self._windows[hours].mean
+
+    def as_dict(self) -> dict:
+        """Return the state in a JSON-serializable form."""
+        return {
+            "hour": self.hour.isoformat() if self.hour else None,
+            "latest": self.latest.isoformat() if self.latest else None,
+            "sum": self._hour_sum,
+            "count": self._hour_count,
+            "hours": self._windows[WINDOWS[-1]].values(),
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict) -> StationAverages:
+        """Rebuild the state saved by as_dict."""
+        averages = cls()
+        averages.hour = parse_datetime(stored["hour"]) if stored["hour"] else None
+        averages.latest = (
+            parse_datetime(stored["latest"]) if stored["latest"] else None
+        )
+        averages._hour_sum = stored["sum"]
+        averages._hour_count = stored["count"]
+        for value in stored["hours"][-WINDOWS[-1]:]:
+            for window in averages._windows.values():
+                window.push(value)
+        return averages
+
+
+class MicroAverageEngine:
+    """Per-station PM2.5 averages and AQI computed from observations.
+
+    ``pm2.5_avg`` follows the MOENV moving average used for the site AQI,
+    half the 12-hour mean plus half the 4-hour mean, and ``aqi`` is the
+    PM2.5 sub-index of that value.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the engine."""
+        self._stations: dict[str, StationAverages] = {}
+
+    def observe(self, station_id: str, observed: datetime, value) -> bool:
+        """Add an observation, return True when the averages changed."""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+        if value < 0 or math.isnan(value):
+            return False
+
+        if (averages := self._stations.get(station_id)) is None:
+            averages = self._stations[station_id] = StationAverages()
+        return averages.observe(observed, value)
+
+    def values(self, station_id: str, now: datetime) -> dict:
+        """Return the derived sensor values of one station at now."""
+        if (averages := self._stations.get(station_id)) is None:
+            return {}
+
+        # 站點停止回報時依時鐘補上空缺, 資料不足後平均值轉為未知
+        averages.advance(now)
+
+        values = {
+            "pm2.5_1h": averages.mean(1),
+            "pm2.5_24h": averages.mean(24),
+        }
+        mean_4h, mean_12h = averages.mean(4), averages.mean(12)
+        if mean_4h is not None and mean_12h is not None:
+            values["pm2.5_avg"] = 0.5 * mean_12h + 0.5 * mean_4h
+            values["aqi"] = pm25_aqi(values["pm2.5_avg"])
+        return {
+            key: round(value, 2)
+            for key, value in values.items()
+            if value is not None
+        }
+
+    def hour(self, station_id: str) -> datetime | None:
+        """Return the start of the hour being collected for a station."""
+        if (averages := self._stations.get(station_id)) is None:
+            return None
+        return averages.hour
+
+    def prune(self, station_ids) -> None:
+        """Forget the stations that are no longer configured."""
+        for station_id in self._stations.keys() - set(station_ids):
+            del self._stations[station_id]
+
+    def as_dict(self) -> dict:
+        """Return the engine state in a JSON-serializable form."""
+        return {
+            station_id: averages.as_dict()
+            for station_id, averages in self._stations.items()
+        }
+
+    def restore(self, stored: dict) -> None:
+        """Restore the state saved by as_dict, skipping invalid entries."""
+        for station_id, state in stored.items():
+            try:
+                self._stations[station_id] = StationAverages.from_dict(state)
+            except (KeyError, TypeError, ValueError):
+                continue
@@ -0,0 +1,243 @@
+"""Indexed catalog of the MOENV monitoring sites."""
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+from dataclasses import dataclass, replace
+from itertools import islice
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.httpx_client import get_async_client
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    HA_USER_AGENT,
+    SITE_API_URL,
+    SITE_CATALOG,
+    SITENAME_DICT,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .geo import GeoGrid
+from .parser import parse_site_coordinates
+
+_LOGGER = logging.getLogger(__name__)
+
+# 由 asset/generate_site_catalog.py 產生
+SITES_FILE = Path(__file__).with_name("sites.json")
+GRID_DEGREES = 0.2
+
+
+@dataclass(frozen=True, slots=True)
+class Site:
+    """One monitoring site in the catalog."""
+
+    site_id: str
+    name: str
+    county: str
+    longitude: float | None = None
+    latitude: float | None = None
+
+    @property
+    def located(self) -> bool:
+        """Return True when the site coordinates are known."""
+        return self.longitude is not None and self.latitude is not None
+
+
+class SiteCatalog:
+    """Sites indexed by ID, county, name and location.
+
+    The catalog is immutable; learning coordinates returns a new catalog.
+    Names are kept sorted for bisect prefix search, and located sites are
+    bucketed into a latitude/longitude grid for nearest queries.
+    """
+
+    def __init__(self, sites) -> None:
+        """Build the indexes."""
+        self._by_id: dict[str, Site] = {site.site_id: site for site in sites}
+
+        by_county: dict[str, list[Site]] = {}
+        for site in self._by_id.values():
+            by_county.setdefault(site.county, []).append(site)
+        self._by_county = {
+            county: tuple(county_sites) for county, county_sites in by_county.items()
+        }
+
+        self._names = sorted((site.name, site.site_id) for site in self._by_id.values())
+
+        self._grid = GeoGrid(
+            (
+                (site.site_id, site.latitude, site.longitude)
+                for site in self._by_id.values()
+                if site.located
+            ),
+            GRID_DEGREES,
+        )
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def get(self, site_id: str) -> Site | None:
+        """Return the site with the given ID."""
+        return self._by_id.get(str(site_id))
+
+    @property
+    def counties(self) -> tuple[str, ...]:
+        """Return the counties in catalog order."""
+        return tuple(self._by_county)
+
+    def in_county(self, county: str) -> tuple[Site, ...]:
+        """Return the sites of one county."""
+        return self._by_county.get(county, ())
+
+    def search(self, prefix: str, limit: int | None = None) -> list[Site]:
+        """Return the sites whose name starts with the prefix."""
+        start = bisect.bisect_left(self._names, (prefix,))
+        results = []
+        for name, site_id in islice(self._names, start, None):
+            if not name.startswith(prefix) or len(results) == limit:
+                break
+            results.append(self._by_id[site_id])
+        return results
+
+    @property
+    def missing_coordinates(self) -> tuple[str, ...]:
+        """Return the IDs of the sites without coordinates."""
+        return tuple(
+            site_id for site_id, site in self._by_id.items() if not site.located
+        )
+
+    def coordinates(self) -> dict[str, tuple[float, float]]:
+        """Return the known (longitude, latitude) of every located site."""
+        return {
+            site_id: (site.longitude, site.latitude)
+            for site_id, site in self._by_id.items()
+            if site.located
+        }
+
+    def with_coordinates(
+        self, coordinates: dict[str, tuple[float, float]]
+    ) -> SiteCatalog:
+        """Return a catalog updated with (longitude, latitude) pairs."""
+        updated = {}
+        for site_id, (longitude, latitude) in coordinates.items():
+            site = self._by_id.get(site_id)
+            if (
+                site is not None
+                and longitude is not None
+                and latitude is not None
+                and (site.longitude, site.latitude) != (longitude, latitude)
+            ):
+                updated[site_id] = replace(
+                    site, longitude=longitude, latitude=latitude
+                )
+
+        if not updated:
+            return self
+        return SiteCatalog({**self._by_id, **updated}.values())
+
+    def nearest(
+        self, latitude: float, longitude: float, count: int = 5
+    ) -> list[tuple[Site, float]]:
+        """Return up to count located sites closest to a point, with km."""
+        return [
+            (self._by_id[site_id], distance)
+            for site_id, distance in self._grid.nearest(latitude, longitude, count)
+        ]
+
+
+def load_site_catalog() -> SiteCatalog:
+    """Read the bundled site list; blocking, run it in the executor."""
+    with SITES_FILE.open(encoding="utf-8") as file:
+        rows = json.load(file)
+
+    return SiteCatalog(
+        Site(
+            site_id,
+            SITENAME_DICT.get(site_id, f"{county}{name}"),
+            county,
+            longitude,
+            latitude,
+        )
+        for site_id, name, county, longitude, latitude in rows
+    )
+
+
+def _store(hass: HomeAssistant) -> Store:
+    """Return the store holding the learned coordinates."""
+    key = f"{SITE_CATALOG}_store"
+    if (store := hass.data.get(key)) is None:
+        store = hass.data[key] = Store(hass, STORAGE_VERSION, SITE_CATALOG)
+    return store
+
+
+async def async_get_site_catalog(hass: HomeAssistant) -> SiteCatalog:
+    """Return the site catalog, loading it on first use."""
+    if (catalog := hass.data.get(SITE_CATALOG)) is None:
+        catalog = await hass.async_add_executor_job(load_site_catalog)
+        # 合併先前從 API 取得的座標
+        if learned := await _store(hass).async_load():
+            catalog = catalog.with_coordinates(
+                {site_id: tuple(lon_lat) for site_id, lon_lat in learned.items()}
+            )
+        hass.data[SITE_CATALOG] = catalog
+    return catalog
+
+
+async def async_learn_site_coordinates(
+    hass: HomeAssistant, coordinates: dict[str, tuple[float, float]]
+) -> SiteCatalog:
+    """Update the catalog with coordinates seen in the Site API data."""
+    catalog = await async_get_site_catalog(hass)
+    updated = catalog.with_coordinates(coordinates)
+    if updated is not catalog:
+        hass.data[SITE_CATALOG] = updated
+        _store(hass).async_delay_save(updated.coordinates, SNAPSHOT_SAVE_DELAY)
+        _LOGGER.debug(
+            "Learned coordinates, %d sites still missing",
+            len(updated.missing_coordinates),
+        )
+    return updated
+
+
+async def async_fetch_site_coordinates(
+    hass: HomeAssistant, api_key: str
+) -> dict[str, tuple[float, float]]:
+    """Download the coordinates of every site in one request."""
+    response = await get_async_client(hass, False).get(
+        SITE_API_URL,
+        params={
+            "api_key": api_key,
+            "format": "CSV",
+            "limit": 1000,
+            "fields": "siteid,longitude,latitude",
+        },
+        headers={"Accept": "text/csv", "User-Agent": HA_USER_AGENT},
+        timeout=15,
+    )
+    response.raise_for_status()
+    return parse_site_coordinates(response.content)
+
+
+async def async_fill_site_coordinates(
+    hass: HomeAssistant, api_key: str
+) -> SiteCatalog:
+    """Fetch the missing coordinates once per run as a fallback."""
+    catalog = await async_get_site_catalog(hass)
+    # 不論成功與否只嘗試一次, API 可能一直沒有部分測站
+    attempted = f"{SITE_CATALOG}_fetched"
+    if not catalog.missing_coordinates or hass.data.get(attempted):
+        return catalog
+
+    hass.data[attempted] = True
+    try:
+        coordinates = await async_fetch_site_coordinates(hass, api_key)
+    except Exception as e:
+        _LOGGER.debug("Unable to fetch site coordinates: %s", e)
+        return catalog
+    return await async_learn_site_coordinates(hass, coordinates)
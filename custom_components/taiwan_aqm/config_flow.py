@@ -7,11 +7,14 @@ from homeassistant import config_entries
 from homeassistant.config_entries import (
     ConfigEntry,
     ConfigFlowResult,
+    ConfigSubentry,
     ConfigSubentryFlow,
+    OptionsFlow,
     SubentryFlowResult,
 )
 from homeassistant.core import callback
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     SelectOptionDict,
     SelectSelector,
     SelectSelectorConfig,
@@ -21,28 +24,94 @@ from homeassistant.helpers.selector import (
     TextSelectorType,
 )
 
+from .catalog import (
+    SiteCatalog,
+    async_fill_site_coordinates,
+    async_get_site_catalog,
+)
 from .const import (
     CONF_API_KEY,
+    CONF_COUNTY,
+    CONF_METADATA_ON_DEVICE,
+    CONF_SITE_SERVER_FILTER,
     CONF_SITEID,
     CONF_STATION_ID,
+    CONF_STRING_SENSORS,
     DOMAIN,
-    SITEID_DICT,
+    NEAREST_SITES,
+    NEAREST_STATIONS,
     SITENAME_DICT,
 )
+from .stations import (
+    StationDirectory,
+    async_fetch_station,
+    async_get_station_directory,
+)
 
 _LOGGER = logging.getLogger(__name__)
 TEXT_SELECTOR = TextSelector(TextSelectorConfig(type=TextSelectorType.TEXT))
-SITE_SELECTOR = SelectSelector(
-    SelectSelectorConfig(
-        options=[
-            SelectOptionDict(value=str(v), label=k)
-            for k, v in SITEID_DICT.items()
-        ],
-        mode=SelectSelectorMode.DROPDOWN,
-        custom_value=False,
-        multiple=False,
+
+
+def _site_selector(catalog: SiteCatalog, nearest) -> SelectSelector:
+    """Return the site selector, listing the nearest sites first."""
+    options = [
+        SelectOptionDict(value=site.site_id, label=f"{site.name} ({distance:.1f} km)")
+        for site, distance in nearest
+    ]
+    listed = {option["value"] for option in options}
+    options.extend(
+        SelectOptionDict(value=site.site_id, label=site.name)
+        for site in catalog
+        if site.site_id not in listed
+    )
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=options,
+            mode=SelectSelectorMode.DROPDOWN,
+            custom_value=False,
+            multiple=True,
+        )
+    )
+
+
+def _county_selector(catalog: SiteCatalog) -> SelectSelector:
+    """Return the county selector used to add every site of a county."""
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=list(catalog.counties),
+            mode=SelectSelectorMode.DROPDOWN,
+            custom_value=False,
+            multiple=True,
+        )
     )
-)
+
+
+def _station_selector(hass, directory: StationDirectory | None):
+    """Return the station ID input, suggesting the stations near home."""
+    if directory is None:
+        return TEXT_SELECTOR
+
+    nearest = directory.nearest(
+        hass.config.latitude, hass.config.longitude, NEAREST_STATIONS
+    )
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=[
+                SelectOptionDict(
+                    value=station.station_id,
+                    label=(
+                        f"{station.station_id} {station.area_description} "
+                        f"({distance:.1f} km)"
+                    ),
+                )
+                for station, distance in nearest
+            ],
+            mode=SelectSelectorMode.DROPDOWN,
+            custom_value=True,
+            multiple=False,
+        )
+    )
+
 
 class TaiwanAQMConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Taiwan AQM."""
@@ -109,6 +178,12 @@ class TaiwanAQMConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return TaiwanAQMOptionsFlow()
+
     @classmethod
     @callback
     def async_get_supported_subentry_types(
@@ -122,30 +197,104 @@ class TaiwanAQMConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         }
 
 
+class TaiwanAQMOptionsFlow(OptionsFlow):
+    """Handle options for Taiwan AQM."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the integration options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_SITE_SERVER_FILTER,
+                    default=options.get(CONF_SITE_SERVER_FILTER, False),
+                ): BooleanSelector(),
+                vol.Optional(
+                    CONF_STRING_SENSORS,
+                    default=options.get(CONF_STRING_SENSORS, True),
+                ): BooleanSelector(),
+                vol.Optional(
+                    CONF_METADATA_ON_DEVICE,
+                    default=options.get(CONF_METADATA_ON_DEVICE, False),
+                ): BooleanSelector(),
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=schema)
+
+
 class SiteSubentryFlowHandler(ConfigSubentryFlow):
     """Handle subentry flow for adding and modifying monitoring sites."""
 
     async def async_step_site(
         self, user_input: dict[str, Any] | None = None
     ) -> SubentryFlowResult:
-        """Site flow to add a new monitoring site."""
+        """Site flow to add one or more monitoring sites."""
         errors: dict[str, str] = {}
+        catalog = await async_get_site_catalog(self.hass)
 
         if user_input is not None:
-            if not user_input.get(CONF_SITEID):
+            # 合併個別選取的測站與整個縣市的測站, 保留選取順序
+            site_ids = list(dict.fromkeys([
+                *user_input.get(CONF_SITEID, []),
+                *(
+                    site.site_id
+                    for county in user_input.get(CONF_COUNTY, [])
+                    for site in catalog.in_county(county)
+                ),
+            ]))
+            entry = self._get_entry()
+            configured = {
+                str(subentry.data.get(CONF_SITEID))
+                for subentry in entry.subentries.values()
+                if subentry.subentry_type == "site"
+            }
+            new_ids = [site_id for site_id in site_ids if site_id not in configured]
+
+            if not site_ids:
                 errors["base"] = "no_id"
+            elif not new_ids:
+                errors["base"] = "site_already_configured"
             else:
-                site_id = user_input[CONF_SITEID]
-                site_name = SITENAME_DICT.get(site_id, f"Site {site_id}")
+                # 其餘測站直接加入, 觸發的更新由整合去抖動後只協調一次
+                for site_id in new_ids[1:]:
+                    site_name = SITENAME_DICT.get(site_id, f"Site {site_id}")
+                    self.hass.config_entries.async_add_subentry(
+                        entry,
+                        ConfigSubentry(
+                            data={CONF_SITEID: site_id},
+                            subentry_type="site",
+                            title=site_name,
+                            unique_id=f"{site_name}_{site_id}",
+                        ),
+                    )
 
+                site_id = new_ids[0]
+                site_name = SITENAME_DICT.get(site_id, f"Site {site_id}")
                 return self.async_create_entry(
                     title=site_name,
-                    data=user_input,
+                    data={CONF_SITEID: site_id},
                     unique_id=f"{site_name}_{site_id}",
                 )
 
+        # 內建目錄缺少的座標只在第一次開啟時向 API 補齊
+        catalog = await async_fill_site_coordinates(
+            self.hass, self._get_entry().data[CONF_API_KEY]
+        )
+
+        nearest = catalog.nearest(
+            self.hass.config.latitude, self.hass.config.longitude, NEAREST_SITES
+        )
         schema = vol.Schema(
-            {vol.Required(CONF_SITEID): SITE_SELECTOR}
+            {
+                vol.Optional(CONF_SITEID): _site_selector(catalog, nearest),
+                vol.Optional(CONF_COUNTY): _county_selector(catalog),
+            }
         )
 
         return self.async_show_form(
@@ -165,26 +314,52 @@ class MicroSensorSubentryFlowHandler(ConfigSubentryFlow):
     ) -> SubentryFlowResult:
         """Micro sensor flow to add a new micro sensor."""
         errors: dict[str, str] = {}
+        placeholders: dict[str, str] = {}
+        directory = await async_get_station_directory(self.hass)
 
         if user_input is not None:
-            station_id = user_input.get(CONF_STATION_ID)
+            station_id = str(user_input.get(CONF_STATION_ID) or "").strip()
             if not station_id:
                 errors["base"] = "no_station_id"
-            else:
+            elif directory is not None and station_id not in directory:
+                # 輸入不完整時以前綴搜尋補全
+                matches = directory.search(station_id, limit=6)
+                if len(matches) == 1:
+                    station_id = matches[0].station_id
+                elif matches:
+                    errors["base"] = "ambiguous_station_id"
+                    placeholders["matches"] = ", ".join(
+                        station.station_id for station in matches[:5]
+                    )
+                elif not await self._async_station_exists(station_id):
+                    errors["base"] = "station_not_found"
+
+            if not errors:
                 return self.async_create_entry(
                     title=f"Micro Sensor-{station_id}",
-                    data=user_input,
-                    unique_id=str(station_id),
+                    data={CONF_STATION_ID: station_id},
+                    unique_id=station_id,
                 )
 
         schema = vol.Schema(
-            {vol.Required(CONF_STATION_ID): TEXT_SELECTOR}
+            {vol.Required(CONF_STATION_ID): _station_selector(self.hass, directory)}
         )
 
         return self.async_show_form(
             step_id="micro_sensor",
             data_schema=schema,
             errors=errors,
+            description_placeholders=placeholders,
         )
     
+    async def _async_station_exists(self, station_id: str) -> bool:
+        """Check an ID missing from the cached directory with one query."""
+        # 目錄最多快取 7 天, 新設的站點可能尚未收錄
+        try:
+            return await async_fetch_station(self.hass, station_id) is not None
+        except Exception as e:
+            # 無法確認時不阻擋設定, 由協調器處理查無的站點
+            _LOGGER.debug("Unable to look up micro sensor %s: %s", station_id, e)
+            return True
+
     async_step_user = async_step_micro_sensor
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.const import Platform
 
@@ -6,19 +8,72 @@ CONF_API_KEY = "api_key"
 CONF_SITEID = "siteID"
 CONF_STATION_ID = "station_id"
 CONF_THING_ID = "thing_id"
+CONF_SITE_SERVER_FILTER = "site_server_filter"
+CONF_METADATA_ON_DEVICE = "metadata_on_device"
+CONF_STRING_SENSORS = "string_sensors"
+CONF_COUNTY = "county"
 SITE_COORDINATOR = "SITE_COORDINATOR"
 MICRO_COORDINATOR = "MICRO_COORDINATOR"
 MICRO_SENSOR_IDS = "MICRO_SENSOR_IDS"
-SITE_UPDATE_TASK = "SITE_UPDATE_TASK"
+ADD_ENTITIES = "ADD_ENTITIES"
+KNOWN_SUBENTRIES = "KNOWN_SUBENTRIES"
+ENTRY_SETTINGS = "ENTRY_SETTINGS"
+RECONCILE_DEBOUNCER = "RECONCILE_DEBOUNCER"
+SITE_CATALOG = f"{DOMAIN}_site_catalog"
+MICRO_DIRECTORY = f"{DOMAIN}_micro_directory"
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+# 初始刷新共用的等待上限
+SETUP_DEADLINE = timedelta(seconds=30)
+# 新增測站時優先列出的最近測站數
+NEAREST_SITES = 5
+NEAREST_STATIONS = 10
+# 批次新增 subentry 時合併為一次協調 (秒)
+RECONCILE_COOLDOWN = 1
 
 SITE_API_URL = "https://data.moenv.gov.tw/api/v2/aqx_p_432"
+SITE_API_PAGE_LIMIT = 100
+# 伺服器端篩選失敗後改用完整下載的時間
+SITE_FILTER_COOLDOWN = timedelta(hours=6)
 
 MICRO_API_BASE_URL = "https://sta.colife.org.tw/STA_AirQuality_EPAIoT/v1.0"
 MICRO_API_FILTER_PARAMS = f"properties/stationID eq '{{stationID}}'"
+# 僅選取解析時會用到的欄位
 MICRO_DATA_API_URL = (
-    f"{MICRO_API_BASE_URL}/Things?$filter=({{filter_params}})&$expand=Locations,"
-    "Datastreams($expand=Observations($orderby=phenomenonTime desc;$top=1))"
+    f"{MICRO_API_BASE_URL}/Things?$filter=({{filter_params}})"
+    "&$select=id,properties"
+    "&$expand=Locations($select=location),"
+    "Datastreams($select=id,name;"
+    "$expand=Observations($select=result,phenomenonTime;"
+    "$orderby=phenomenonTime desc;$top=1))"
+)
+MICRO_DATASTREAM_FILTER_PARAMS = "id eq {datastreamID}"
+MICRO_OBSERVATIONS_API_URL = (
+    f"{MICRO_API_BASE_URL}/Datastreams?$filter=({{filter_params}})&$select=id"
+    "&$expand=Observations($select=result,phenomenonTime;{obs_filter}"
+    "$orderby=phenomenonTime desc;$top=1)"
+)
+MICRO_METADATA_REFRESH = timedelta(hours=6)
+# 查無 Thing 的站點以 MICRO_METADATA_REFRESH 為基準退避重試的上限
+MICRO_MISSING_MAX_BACKOFF = timedelta(hours=24)
+# 微型感測器測站目錄, 分頁下載後快取於磁碟
+MICRO_DIRECTORY_PAGE_SIZE = 1000
+MICRO_DIRECTORY_MAX_PAGES = 100
+MICRO_DIRECTORY_TTL = timedelta(days=7)
+# 目錄下載失敗後, 設定流程在這段時間內不再重試
+MICRO_DIRECTORY_RETRY = timedelta(minutes=30)
+MICRO_THINGS_API_URL = (
+    f"{MICRO_API_BASE_URL}/Things?$select=id,properties"
+    "&$expand=Locations($select=location)"
+    f"&$top={MICRO_DIRECTORY_PAGE_SIZE}"
 )
+# 目錄中沒有的站點以單一查詢確認
+MICRO_STATION_API_URL = (
+    f"{MICRO_API_BASE_URL}/Things?$filter={MICRO_API_FILTER_PARAMS}"
+    "&$select=id,properties&$expand=Locations($select=location)"
+)
+MICRO_BATCH_SIZE = 20
+MICRO_MAX_CONCURRENCY = 4
 
 HA_USER_AGENT = (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -118,6 +173,9 @@ SITEID_DICT = {
 
 SITENAME_DICT = {v: k for k, v in SITEID_DICT.items()}
 
+# 文字型態的測站感測器, 可於選項中停用
+STRING_SENSOR_TYPES = ("pollutant", "status", "publishtime")
+
 SENSOR_INFO = {
     "aqi": {
         "device_class": SensorDeviceClass.AQI,
@@ -267,3 +325,23 @@ SENSOR_INFO = {
         "icon": "mdi:thermometer",
     },
 }
+
+# 微型感測器由本地計算的 PM2.5 時間窗平均值
+MICRO_AVERAGE_SENSOR_INFO = {
+    "pm2.5_1h": {
+        "device_class": SensorDeviceClass.PM25,
+        "unit": "µg/m³",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "display_precision": 2,
+        "icon": "mdi:molecule",
+    },
+    "pm2.5_24h": {
+        "device_class": SensorDeviceClass.PM25,
+        "unit": "µg/m³",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "display_precision": 2,
+        "icon": "mdi:molecule",
+    },
+}
+# 由 PM2.5 觀測值計算的微型感測器值, 資料不足時為未知
+MICRO_DERIVED_SENSOR_TYPES = (*MICRO_AVERAGE_SENSOR_INFO, "pm2.5_avg", "aqi")
@@ -1,144 +1,326 @@
 from __future__ import annotations
 
 import asyncio
-import csv
-import functools
 import logging
-import random
+import time
 from abc import ABC, abstractmethod
-from datetime import timedelta
-from io import StringIO
-from typing import (
-    Any,
-    Callable,
-    TypeVar,
-)
+from datetime import datetime, timedelta
+from typing import Any
 
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.httpx_client import get_async_client
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.util.dt import as_local, parse_datetime
+from homeassistant.util import dt as dt_util
+from homeassistant.util.dt import parse_datetime
 
 from .const import (
     DOMAIN,
     HA_USER_AGENT,
+    SITE_API_PAGE_LIMIT,
     SITE_API_URL,
+    SITE_FILTER_COOLDOWN,
     MICRO_API_FILTER_PARAMS,
+    MICRO_BATCH_SIZE,
     MICRO_DATA_API_URL,
+    MICRO_DATASTREAM_FILTER_PARAMS,
+    MICRO_MAX_CONCURRENCY,
+    MICRO_METADATA_REFRESH,
+    MICRO_MISSING_MAX_BACKOFF,
+    MICRO_OBSERVATIONS_API_URL,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
 )
+from .aqi import MicroAverageEngine
+from .catalog import async_learn_site_coordinates
 from .exceptions import (
     ApiAuthError,
+    CircuitOpenError,
     DataNotFoundError,
     RecordNotFoundError,
     RequestFailedError,
     RequestTimeoutError,
     UnexpectedStatusError,
 )
+from .models import SITE_FIELDS, SiteRecord
+from .parser import (
+    SiteCsvStreamParser,
+    classify_datastream,
+    json_loads,
+    parse_micro_coordinates,
+)
+from .retry import RetryPolicy, parse_retry_after, retry_on_failure
+from .scheduler import MicroStationScheduler, SitePublishScheduler
 
 _LOGGER = logging.getLogger(__name__)
-F = TypeVar("F", bound=Callable[..., Any])
 
+# 快照中保存微型感測器平均值狀態的鍵, 不會與站點 ID 重複
+AVERAGES_KEY = "_averages"
 
-def retry_on_failure(max_retries: int = 5):
-    """Retry decorator for coroutine functions."""
-    def decorator(func: F) -> F:
-        @functools.wraps(func)
-        async def wrapper(self, *args, **kwargs):
-            last_error = {"name": "Unknown"}
 
-            for attempt in range(max_retries):
-                try:
-                    return await func(self, *args, **kwargs)
-                except ApiAuthError:
-                    raise
-                except DataNotFoundError as e:
-                    last_error = e
-                    _LOGGER.warning(
-                        "No valid data found in the %s API response. "
-                        "Retrying... (%d/5)",
-                        e["name"],
-                        attempt + 1,
-                    )
-                except RecordNotFoundError as e:
-                    last_error = e
-                    _LOGGER.warning(
-                        "No records found in the Site API response. "
-                        "Retrying... (%d/5)",
-                        attempt + 1,
-                    )
-                except UnexpectedStatusError as e:
-                    last_error = e
-                    _LOGGER.warning(
-                        "%s API returned unexpected status code: %s. "
-                        "Retrying... (%d/5)",
-                        e["name"],
-                        e["code"],
-                        attempt + 1,
-                    )
-                except RequestTimeoutError as e:
-                    last_error = e
-                    _LOGGER.warning(
-                        "%s API Request timed out: %s. Retrying... (%d/5)",
-                        e["name"],
-                        e["exception"],
-                        attempt + 1,
-                    )
-                except RequestFailedError as e:
-                    last_error = e
-                    _LOGGER.warning(
-                        "%s API Request failed: %s. Retrying... (%d/5)",
-                        e["name"],
-                        e["exception"],
-                        attempt + 1,
-                    )
+def snapshot_store(hass, name: str, entry_id: str) -> Store:
+    """Return the store holding one coordinator's snapshot."""
+    return Store(hass, STORAGE_VERSION, f"{name}.{entry_id}")
 
-                if attempt < (max_retries - 1):
-                    await asyncio.sleep(random.uniform(5, 15))
 
-            await self.hass.services.async_call(
-                "notify",
-                "persistent_notification",
-                {
-                    "message": (
-                        f"Failed to fetch data after 5 attempts "
-                        f"in the {last_error['name']} API."
-                    ),
-                    "title": "Taiwan Air Quality Monitor Error",
-                },
-            )
-            return None
-        return wrapper
-    return decorator
+async def async_remove_snapshots(hass, entry_id: str) -> None:
+    """Remove the snapshots of every coordinator of a config entry."""
+    for coordinator_class in (SiteCoordinator, MicroSensorCoordinator):
+        await snapshot_store(
+            hass, coordinator_class.coordinator_name, entry_id
+        ).async_remove()
 
 
 class baseCoordinator(DataUpdateCoordinator, ABC):
     """Base class to manage fetching data from the API."""
 
-    def __init__(self, hass, name, update_interval):
+    coordinator_name: str
+
+    def __init__(
+        self,
+        hass,
+        config_entry,
+        name,
+        update_interval,
+        always_update=True,
+        freshness=timedelta(seconds=30),
+        metadata_on_device=False,
+    ):
         """Initialize the coordinator."""
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=config_entry,
             name=name,
             update_interval=update_interval,
+            always_update=always_update,
         )
         self.hass = hass
         self.client = get_async_client(hass, False)
+        # 靜態資料顯示於裝置時, 屬性中不再重複
+        self.metadata_on_device = metadata_on_device
+        # 保存最後一次成功的資料, 供啟動時還原
+        self._store = snapshot_store(hass, name, config_entry.entry_id)
+        # 合併同時發生的刷新請求
+        self.freshness = freshness
+        self._inflight: asyncio.Task | None = None
+        self._last_fetch: float | None = None
+        # 上次更新有變動的 (ID, 感測器類型), None 表示全部實體都需更新
+        self.changed_keys: frozenset[tuple[str, str]] | None = None
+        # 預先驗證的感測器數值與整理好的屬性, 每次資料更新時重建
+        self.values: dict[tuple[str, str], Any] = {}
+        self.attributes: dict[str, dict[str, Any]] = {}
+        self._missing_ids: list[str] = []
 
     async def _async_update_data(self):
+        """Fetch data and record which sensors changed."""
+        previous = self.data if self.last_update_success else None
+        try:
+            data = await self._async_shared_update()
+        except Exception:
+            self.changed_keys = None
+            raise
+
+        self.changed_keys = (
+            None if previous is None
+            else frozenset(self._changed_keys(previous, data))
+        )
+        if data is not self.data or not self.values:
+            self._publish_snapshot(data)
+        return data
+
+    @property
+    def configured_ids(self) -> list[str]:
+        """Return the configured site or station IDs."""
+        return []
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return coordinator specific diagnostics."""
+        return {}
+
+    @callback
+    def async_set_configured_ids(self, ids: list[str]) -> None:
+        """Replace the configured IDs without recreating the coordinator."""
+        self._set_configured_ids(ids)
+        keep = set(ids)
+
+        # 移除的 ID 直接從現有資料中去除, 不需重新抓取
+        if self.data and not keep.issuperset(self.data):
+            self.data = {i: v for i, v in self.data.items() if i in keep}
+            self.values = {k: v for k, v in self.values.items() if k[0] in keep}
+            self.attributes = {
+                k: v for k, v in self.attributes.items() if k in keep
+            }
+            self._async_save_snapshot()
+
+        if missing := keep.difference(self.data or {}):
+            _LOGGER.debug("Fetching %s data for new IDs %s", self.name, missing)
+            if self._inflight is not None:
+                # 進行中的抓取不含新 ID, 且完成時會寫回指紋, 結束後再刷新
+                self._inflight.add_done_callback(
+                    lambda _: self._async_refresh_new_ids()
+                )
+            else:
+                self._async_refresh_new_ids()
+
+    @callback
+    def _async_refresh_new_ids(self) -> None:
+        """Request a fully parsed fetch that includes the new IDs."""
+        self.async_invalidate_freshness()
+        self._reset_change_detection()
+        self.hass.async_create_task(
+            self.async_request_refresh(), f"{self.name}_reconcile_refresh"
+        )
+
+    @abstractmethod
+    def _set_configured_ids(self, ids: list[str]) -> None:
+        """Store the configured IDs."""
+
+    def _reset_change_detection(self) -> None:
+        """Forget cached change markers so the next fetch is fully parsed."""
+
+    def _publish_snapshot(self, data: dict) -> None:
+        """Validate the payload once and shape it for the entities."""
+        values = {}
+        attributes = {}
+        for data_id, item in data.items():
+            attributes[data_id] = self._shape_attributes(data_id, item)
+            for sensor_type, value in self._sensor_values(item):
+                if value is not None and value != "":
+                    values[(data_id, sensor_type)] = value
+
+        # 缺少的 ID 有變動時才警告, 避免每次輪詢重複記錄
+        missing = [i for i in self.configured_ids if i not in data]
+        if missing and missing != self._missing_ids:
+            _LOGGER.warning("IDs %s are not in the %s data", missing, self.name)
+        self._missing_ids = missing
+
+        self.values = values
+        self.attributes = attributes
+
+    def _sensor_values(self, item: dict):
+        """Yield the (sensor type, value) pairs of one ID."""
+        for key, value in item.items():
+            if f"{key}_time" in item:
+                yield key, value
+
+    def _shape_attributes(self, data_id: str, item: dict) -> dict[str, Any]:
+        """Return the state attributes shared by the sensors of one ID."""
+        return {}
+
+    def _changed_keys(self, old: dict, new: dict):
+        """Yield the (ID, sensor type) keys that differ between two payloads."""
+        for data_id in old.keys() | new.keys():
+            before = old.get(data_id) or {}
+            after = new.get(data_id) or {}
+            if before == after:
+                continue
+
+            keys = before.keys() | after.keys()
+            sensor_types = {key for key in keys if f"{key}_time" in keys}
+            changed = {
+                key.removesuffix("_time")
+                for key in keys
+                if before.get(key) != after.get(key)
+            }
+            # 共用屬性變動時所有感測器都需更新
+            if changed - sensor_types:
+                changed = sensor_types
+            yield from ((data_id, sensor_type) for sensor_type in changed)
+
+    async def _async_shared_update(self):
+        """Share one in-flight fetch between concurrent refresh requests."""
+        if self._inflight is None:
+            if (
+                self.data
+                and self._last_fetch is not None
+                and time.monotonic() - self._last_fetch
+                < self.freshness.total_seconds()
+            ):
+                _LOGGER.debug("Serving %s refresh from fresh data", self.name)
+                return self.data
+
+            self._inflight = self.hass.async_create_task(
+                self._async_fetch_data(), f"{self.name}_fetch"
+            )
+            self._inflight.add_done_callback(self._clear_inflight)
+        else:
+            _LOGGER.debug("Joining in-flight %s refresh", self.name)
+
+        return await asyncio.shield(self._inflight)
+
+    @callback
+    def _clear_inflight(self, task: asyncio.Task) -> None:
+        """Forget the finished fetch task."""
+        if self._inflight is task:
+            self._inflight = None
+        if not task.cancelled():
+            # 避免無人等待時出現 "exception never retrieved"
+            task.exception()
+
+    @callback
+    def async_invalidate_freshness(self) -> None:
+        """Make the next refresh fetch from the API."""
+        self._last_fetch = None
+
+    async def _async_fetch_data(self):
         """Fetch data from API."""
         try:
             data = await self._get_data_with_retry()
             if data:
+                self._last_fetch = time.monotonic()
+                if data is not self.data:
+                    self._async_save_snapshot()
                 return data
             else:
                 raise UpdateFailed("No data received from API")
         except ApiAuthError:
             raise ConfigEntryAuthFailed("API key expired or invalid")
+        except CircuitOpenError as e:
+            raise UpdateFailed(
+                f"{e['name']} API requests paused until {e['until']}"
+            ) from e
         except Exception as e:
             raise UpdateFailed(f"Unexpected error during data update: {e}") from e
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last successful payload, return True if restored."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as e:
+            _LOGGER.warning("Failed to load %s snapshot: %s", self.name, e)
+            return False
+
+        if not stored or not (data := self._restore_data(stored)):
+            return False
+
+        self.data = data
+        self._publish_snapshot(data)
+        _LOGGER.debug("Restored %s snapshot for %d IDs", self.name, len(data))
+        return True
+
+    async def async_remove_snapshot(self) -> None:
+        """Remove the persisted snapshot."""
+        await self._store.async_remove()
+
+    @callback
+    def _async_save_snapshot(self) -> None:
+        """Schedule a debounced write of the current payload."""
+        self._store.async_delay_save(
+            lambda: self._serialize_data(self.data), SNAPSHOT_SAVE_DELAY
+        )
+
+    def _serialize_data(self, data) -> dict:
+        """Convert coordinator data to a JSON-serializable dict."""
+        return dict(data or {})
+
+    def _restore_data(self, stored: dict) -> dict:
+        """Convert a stored snapshot back to coordinator data."""
+        return stored
     
-    @retry_on_failure(max_retries=5)
+    @retry_on_failure()
     async def _get_data_with_retry(self, *args, **kwargs):
         """Fetch data from API with retry."""
         return await self._get_data(*args, **kwargs)
@@ -151,56 +333,185 @@ class baseCoordinator(DataUpdateCoordinator, ABC):
 class SiteCoordinator(baseCoordinator):
     """Class to manage fetching data from the Site API."""
 
-    def __init__(self, hass, api_key, site_ids):
+    coordinator_name = f"{DOMAIN}_site"
+
+    def __init__(
+        self,
+        hass,
+        config_entry,
+        api_key,
+        site_ids,
+        server_filter=False,
+        metadata_on_device=False,
+    ):
         """Initialize the Site coordinator."""
         super().__init__(
             hass,
-            name=f"{DOMAIN}_site",
-            update_interval=timedelta(minutes=11),
+            config_entry,
+            name=self.coordinator_name,
+            update_interval=timedelta(minutes=5),
+            # 資料未變更時不通知實體
+            always_update=False,
+            metadata_on_device=metadata_on_device,
         )
 
+        self.retry_policy = RetryPolicy(
+            "Site",
+            base_delay=5.0,
+            max_delay=60.0,
+            cooldown=timedelta(minutes=30),
+        )
         self.api_key = api_key
         self.siteids = site_ids
+        self.server_filter = server_filter
+        # 伺服器端篩選失敗後暫停使用的截止時間 (monotonic)
+        self._filter_paused_until: float | None = None
+        # 變更偵測用的指紋
+        self._etag = None
+        self._last_modified = None
+        self._fingerprint = None
+        self._scheduler = SitePublishScheduler()
+
+    async def _async_update_data(self):
+        """Fetch data and schedule the next poll around the publish window."""
+        data = await super()._async_update_data()
+
+        now = dt_util.now()
+        self._scheduler.observe(
+            max(
+                (p for r in data.values() if (p := r.get("publishtime"))),
+                default=None,
+            ),
+            now,
+        )
+        self.update_interval = self._scheduler.next_interval(now)
+        _LOGGER.debug("Next Site API poll in %s", self.update_interval)
+
+        # 將 API 提供的座標記入測站目錄, 供設定流程查詢最近測站
+        if self.changed_keys is None or self.changed_keys:
+            await async_learn_site_coordinates(
+                self.hass,
+                {
+                    site_id: (record.get("longitude"), record.get("latitude"))
+                    for site_id, record in data.items()
+                },
+            )
+        return data
+
+    async def async_restore_snapshot(self) -> bool:
+        """Restore the snapshot and reuse its publishtime as fingerprint."""
+        if not await super().async_restore_snapshot():
+            return False
+
+        self._fingerprint = next(iter(self.data.values())).get("publishtime")
+        return True
+
+    @property
+    def configured_ids(self) -> list[str]:
+        """Return the configured site IDs."""
+        return self.siteids
+
+    def _set_configured_ids(self, ids: list[str]) -> None:
+        """Store the configured site IDs."""
+        self.siteids = ids
+
+    def _reset_change_detection(self) -> None:
+        """Forget the ETag and publishtime fingerprint."""
+        self._etag = None
+        self._last_modified = None
+        self._fingerprint = None
+
+    def _sensor_values(self, item: SiteRecord):
+        """Yield the (field, value) pairs of one site."""
+        return item.items()
+
+    def _shape_attributes(self, data_id: str, item: SiteRecord) -> dict[str, Any]:
+        """Return the state attributes shared by the sensors of one site."""
+        attributes = {
+            "siteID": data_id,
+            "longitude": item.get("longitude", "unknown"),
+            "latitude": item.get("latitude", "unknown"),
+        }
+        if self.metadata_on_device:
+            del attributes["siteID"]
+        return attributes
+
+    def _changed_keys(self, old: dict, new: dict):
+        """Yield the (site ID, field) keys that differ between two payloads."""
+        for site_id in old.keys() | new.keys():
+            before = old.get(site_id)
+            after = new.get(site_id)
+            if before == after:
+                continue
+
+            if before is None or after is None:
+                changed = SITE_FIELDS
+            else:
+                changed = after.diff(before)
+                # 座標為所有感測器的屬性
+                if "longitude" in changed or "latitude" in changed:
+                    changed = SITE_FIELDS
+            yield from ((site_id, field) for field in changed)
+
+    def _serialize_data(self, data) -> dict:
+        """Convert site records to JSON-serializable lists."""
+        return {
+            site_id: record.to_json()
+            for site_id, record in (data or {}).items()
+        }
+
+    def _restore_data(self, stored: dict) -> dict:
+        """Rebuild site records for the configured sites."""
+        return {
+            site_id: record
+            for site_id, values in stored.items()
+            if site_id in self.siteids
+            and (record := SiteRecord.from_json(site_id, values)) is not None
+        }
 
     async def _get_data(self):
         """Fetch the AQI data from the API."""
-
-        params = {"language": "zh", "api_key": self.api_key, "format": "CSV"}
         headers = {
             "Accept": "text/csv",
             "User-Agent": HA_USER_AGENT,
         }
+        # 已有資料時才送出 HTTP 驗證標頭
+        if self.data:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
 
         err = {"name": "Site",}
 
         try:
-            response = await self.client.get(
-                SITE_API_URL, headers=headers, params=params, timeout=15
-            )
+            aq_data = None
+            if self._use_server_filter():
+                try:
+                    # 每次嘗試使用各自的錯誤資訊, 避免狀態碼混入完整下載的錯誤
+                    aq_data = await self._get_filtered_data(
+                        headers, {"name": "Site"}
+                    )
+                except ApiAuthError:
+                    raise
+                except Exception as e:
+                    # 伺服器端篩選失敗時改用完整下載, 冷卻期間不再嘗試
+                    self._filter_paused_until = (
+                        time.monotonic() + SITE_FILTER_COOLDOWN.total_seconds()
+                    )
+                    _LOGGER.warning(
+                        "Filtered Site API query failed: %s. "
+                        "Using full downloads for %s",
+                        e,
+                        SITE_FILTER_COOLDOWN,
+                    )
 
-            if response.is_success:
-                records = await self.hass.async_add_executor_job(
-                    self._parse_csv_response, response
-                )
+            if aq_data is None:
+                aq_data = await self._get_full_data(headers, err)
 
-                if records:
-                    aq_data = {
-                        site_id: data
-                        for data in records
-                        if (site_id := str(data.get("siteid"))) in self.siteids
-                    }
-                    if aq_data:
-                        _LOGGER.debug(
-                            "Successfully fetched data for %d sites", len(aq_data)
-                        )
-                        return aq_data
-                    else:
-                        raise DataNotFoundError(err)
-                else:
-                    raise RecordNotFoundError(err)
-            else:
-                err["code"] = response.status_code
-                raise UnexpectedStatusError(err)
+            if aq_data is not self.data:
+                self._fingerprint = next(iter(aq_data.values())).get("publishtime")
+            return aq_data
 
         except DataNotFoundError as e:
             raise
@@ -217,76 +528,554 @@ class SiteCoordinator(baseCoordinator):
             err["exception"] = str(e)
             raise RequestFailedError(err) from e
 
-    def _parse_csv_response(self, response):
-        """Parse CSV response content and return list of record dicts."""
-        try:
-            if hasattr(response, "text"):
-                raw_text = response.text
-            else:
-                raw_data = response.read()
-                # 嘗試不同的編碼方式
-                for encoding in ["utf-8", "big5", "gb2312"]:
-                    try:
-                        raw_text = raw_data.decode(encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    # 如果所有編碼都失敗, 使用 utf-8 並替換錯誤字符
-                    raw_text = raw_data.decode("utf-8", errors="replace")
-                    _LOGGER.warning("Used fallback encoding with character replacement")
+    def _use_server_filter(self) -> bool:
+        """Return True when the filtered query should be tried."""
+        if not self.server_filter:
+            return False
+        if self._filter_paused_until is not None:
+            if time.monotonic() < self._filter_paused_until:
+                return False
+            self._filter_paused_until = None
+        return True
 
-            _LOGGER.debug(
-                "Raw CSV API Response length: %d characters", len(raw_text)
-            )
+    async def _get_full_data(self, headers, err):
+        """Download the whole dataset and keep the configured sites."""
+        params = {"language": "zh", "api_key": self.api_key, "format": "CSV"}
+        parser = SiteCsvStreamParser(self.siteids)
 
-            # 檢查是否為空響應
-            if not raw_text.strip():
-                _LOGGER.warning("Received empty CSV in Site API response")
-                return None
-            
-            # 檢查是否包含錯誤訊息
-            if any(keyword in raw_text.lower() for keyword in ["不存在", "過期", "失效", "無效", "expired", "invalid"]):
-                _LOGGER.error("Detected possible auth issue in Site API response: %s", raw_text[:100])
-                raise ApiAuthError
+        if not await self._stream_csv(params, headers, parser, err):
+            return self.data
 
-            csv_reader = csv.DictReader(StringIO(raw_text))
-            records = list(csv_reader)
+        if not parser.row_count:
+            raise RecordNotFoundError(err)
+        if not parser.records:
+            raise DataNotFoundError(err)
 
-            _LOGGER.debug("Parsed %d records from CSV", len(records))
+        _LOGGER.debug(
+            "Successfully fetched data for %d sites after %d rows",
+            len(parser.records),
+            parser.row_count,
+        )
+        return parser.records
 
-            return records
+    async def _get_filtered_data(self, headers, err):
+        """Request only the configured sites and columns, page by page."""
+        params = {
+            "language": "zh",
+            "api_key": self.api_key,
+            "format": "CSV",
+            # 多個值以 | 分隔, 多個條件以 : 分隔
+            "filters": f"siteid,EQ,{'|'.join(self.siteids)}",
+            "fields": ",".join((*SITE_FIELDS, "siteid")),
+            "limit": SITE_API_PAGE_LIMIT,
+        }
+        records = {}
+        offset = 0
 
-        except csv.Error as e:
-            _LOGGER.error("CSV parsing error: %s", e)
-            return None
-        except ApiAuthError:
-            raise
-        except Exception as e:
-            _LOGGER.error("Unexpected error parsing CSV data: %s", e)
-            return None
+        while True:
+            parser = SiteCsvStreamParser(self.siteids)
+            if not await self._stream_csv(
+                {**params, "offset": offset}, headers, parser, err,
+                check_unchanged=(offset == 0),
+            ):
+                return self.data
+
+            records.update(parser.records)
+            if (
+                len(records) >= len(self.siteids)
+                or parser.row_count < SITE_API_PAGE_LIMIT
+            ):
+                break
+            offset += SITE_API_PAGE_LIMIT
+
+        # 篩選結果缺少站點時視為失敗, 交由完整下載處理
+        if len(records) < len(self.siteids):
+            raise DataNotFoundError(err)
+
+        _LOGGER.debug(
+            "Successfully fetched filtered data for %d sites", len(records)
+        )
+        return records
+
+    async def _stream_csv(
+        self, params, headers, parser, err, check_unchanged=True
+    ) -> bool:
+        """Stream one Site API response into the parser.
+
+        Returns False when the response is known to be unchanged.
+        """
+        async with self.client.stream(
+            "GET", SITE_API_URL, headers=headers, params=params, timeout=15
+        ) as response:
+            if response.status_code == 304 and self.data:
+                _LOGGER.debug("Site API data not modified, skip parsing")
+                return False
+
+            if response.status_code in (401, 403):
+                raise ApiAuthError(err)
+
+            if not response.is_success:
+                err["code"] = response.status_code
+                err["retry_after"] = parse_retry_after(
+                    response.headers.get("Retry-After")
+                )
+                raise UnexpectedStatusError(err)
+
+            etag = response.headers.get("ETag")
+            if check_unchanged and self.data and etag and etag == self._etag:
+                _LOGGER.debug("Site API ETag unchanged, skip parsing")
+                return False
+
+            async for chunk in response.aiter_bytes():
+                done = parser.feed(chunk)
+                if check_unchanged and self._is_unchanged(parser):
+                    _LOGGER.debug("Site API publishtime unchanged, skip parsing")
+                    return False
+                if done:
+                    break
+            else:
+                parser.close()
+
+            self._etag = etag
+            self._last_modified = response.headers.get("Last-Modified")
+            return True
+
+    def _is_unchanged(self, parser: SiteCsvStreamParser) -> bool:
+        """Check whether the first matched row was already published."""
+        return (
+            bool(self.data)
+            and self._fingerprint is not None
+            and parser.first_publishtime == self._fingerprint
+        )
 
 
 class MicroSensorCoordinator(baseCoordinator):
-    """Class to manage fetching data from the Micro Sensor API."""
+    """Class to manage fetching data from the Micro Sensor API.
+
+    Thing and Datastream metadata is discovered with a full query and
+    refreshed every ``MICRO_METADATA_REFRESH``. Between refreshes only the
+    Observations newer than the last one seen are requested for the
+    known Datastream IDs, and only for the stations that the
+    ``MicroStationScheduler`` expects to have reported again. New
+    stations get their metadata on the next poll; stations the server
+    does not return are retried with backoff instead of forcing a full
+    query on every poll.
+    """
 
-    def __init__(self, hass, station_ids):
+    coordinator_name = f"{DOMAIN}_micro_sensors"
+
+    def __init__(
+        self,
+        hass,
+        config_entry,
+        station_ids,
+        batch_size=MICRO_BATCH_SIZE,
+        max_concurrency=MICRO_MAX_CONCURRENCY,
+        metadata_on_device=False,
+    ):
         """Initialize the Micro Sensor coordinator."""
         super().__init__(
             hass,
-            name=f"{DOMAIN}_micro_sensors",
+            config_entry,
+            name=self.coordinator_name,
             update_interval=timedelta(minutes=2),
+            metadata_on_device=metadata_on_device,
         )
 
+        self.retry_policy = RetryPolicy(
+            "Micro_Sensor",
+            base_delay=2.0,
+            max_delay=20.0,
+            cooldown=timedelta(minutes=10),
+        )
         self.station_ids = station_ids
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        # 靜態資料快取: station_id -> Thing 屬性與 Datastream 對應表
+        self._things: dict[str, dict] = {}
+        # 觀測值快取: datastream_id -> (result, phenomenonTime)
+        self._observations: dict[int, tuple] = {}
+        self._metadata_updated: float | None = None
+        # 查無 Thing 的站點: station_id -> (連續查無次數, 下次查詢的 monotonic 時間)
+        self._missing: dict[str, tuple[int, float]] = {}
+        # 觀測時間快取: datastream_id -> (原始字串, datetime)
+        self._parsed_times: dict[int, tuple] = {}
+        self._scheduler = MicroStationScheduler()
+        # 由 PM2.5 觀測值計算的平均值與 AQI
+        self._averages = MicroAverageEngine()
+        # 所屬批次抓取失敗的站點
+        self.stale_ids: frozenset[str] = frozenset()
+        # 已寫入裝置登錄的站點資訊
+        self._device_metadata: dict[str, dict] = {}
+
+    async def _async_update_data(self):
+        """Fetch data and wait until the next station is due."""
+        data = await super()._async_update_data()
+
+        # 查無 Thing 的站點依退避時間另行查詢, 不影響輪詢間隔
+        self.update_interval = self._scheduler.next_interval(
+            [i for i in self.station_ids if i in self._things], dt_util.utcnow()
+        )
+        _LOGGER.debug("Next Micro Sensor poll in %s", self.update_interval)
+        return data
+
+    @property
+    def configured_ids(self) -> list[str]:
+        """Return the configured station IDs."""
+        return self.station_ids
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the learned cadences and the stations not found."""
+        return {
+            "station_cadences": self._scheduler.as_dict(),
+            "missing_stations": {
+                station_id: misses
+                for station_id, (misses, _) in self._missing.items()
+            },
+        }
+
+    def _set_configured_ids(self, ids: list[str]) -> None:
+        """Store the configured station IDs and drop the removed ones' caches."""
+        self.station_ids = ids
+        removed = (
+            self._things.keys() | self._missing.keys() | self._device_metadata.keys()
+        ) - set(ids)
+        for station_id in removed:
+            # 重新加入的站點需重新查詢靜態資料, 不沿用舊的快取
+            thing = self._things.pop(station_id, None) or {}
+            for datastream_id in thing.get("datastreams", ()):
+                self._observations.pop(datastream_id, None)
+                self._parsed_times.pop(datastream_id, None)
+            self._missing.pop(station_id, None)
+            self._device_metadata.pop(station_id, None)
+        self._averages.prune(ids)
+        self._scheduler.prune(ids)
+
+    def _publish_snapshot(self, data: dict) -> None:
+        """Validate the payload and record the stale stations."""
+        super()._publish_snapshot(data)
+        self.stale_ids = frozenset(
+            station_id for station_id, station in data.items()
+            if station.get("stale")
+        )
+        if self.metadata_on_device:
+            self._async_update_devices(data)
+
+    def device_metadata(self, station_id: str, data: dict | None = None) -> dict:
+        """Return the station metadata shown on the device."""
+        metadata = {"serial_number": station_id}
+        if data is None:
+            data = self.data
+        station = (data or {}).get(station_id) or {}
+        if (thing_id := station.get("thing_id")) is not None:
+            metadata["model_id"] = str(thing_id)
+        if description := station.get("Description"):
+            metadata["model"] = description
+        if authority := station.get("authority"):
+            metadata["manufacturer"] = authority
+        return metadata
+
+    @callback
+    def _async_update_devices(self, data: dict) -> None:
+        """Write station metadata that arrived or changed to the devices."""
+        registry = dr.async_get(self.hass)
+        for station_id in data:
+            metadata = self.device_metadata(station_id, data)
+            if self._device_metadata.get(station_id) == metadata:
+                continue
+            # 實體尚未加入時, 建立裝置會帶入當時的資訊
+            if (
+                device := registry.async_get_device(
+                    identifiers={(DOMAIN, station_id)}
+                )
+            ) is None:
+                continue
+            registry.async_update_device(device.id, **metadata)
+            self._device_metadata[station_id] = metadata
+
+    def _shape_attributes(self, data_id: str, item: dict) -> dict[str, Any]:
+        """Return the state attributes shared by the sensors of one station."""
+        attributes = {
+            "thingID": item.get("thing_id", "unknown"),
+            "stationID": data_id,
+            "Description": item.get("Description", "unknown"),
+            "areaType": item.get("areaType", "unknown"),
+            "areaDescription": item.get("areaDescription", "unknown"),
+            "authority": item.get("authority", "unknown"),
+            "longitude": item.get("longitude", "unknown"),
+            "latitude": item.get("latitude", "unknown"),
+        }
+        if self.metadata_on_device:
+            # 這些資料改由裝置資訊提供
+            for key in ("thingID", "stationID", "Description", "authority"):
+                del attributes[key]
+        return attributes
+
+    def _serialize_data(self, data) -> dict:
+        """Convert observation times to ISO strings."""
+        return {
+            **{
+                station_id: {
+                    key: value.isoformat() if isinstance(value, datetime) else value
+                    for key, value in station.items()
+                }
+                for station_id, station in (data or {}).items()
+            },
+            # 平均值的時間窗一併保存, 重新啟動後不需重新累積
+            AVERAGES_KEY: self._averages.as_dict(),
+        }
+
+    def _restore_data(self, stored: dict) -> dict:
+        """Keep the stored stations that are still configured."""
+        stored = dict(stored)
+        self._averages.restore(stored.pop(AVERAGES_KEY, None) or {})
+        self._averages.prune(self.station_ids)
+
+        data = {}
+        for station_id, station in stored.items():
+            if station_id not in self.station_ids:
+                continue
+            # 觀測時間以 ISO 字串保存, 還原為 datetime
+            data[station_id] = {
+                key: (
+                    self._parse_datetime(value)
+                    if key.endswith("_time") and isinstance(value, str)
+                    else value
+                )
+                for key, value in station.items()
+            }
+        return data
+
+    def _metadata_expired(self) -> bool:
+        """Return True when Thing metadata must be fetched again."""
+        return (
+            self._metadata_updated is None
+            or time.monotonic() - self._metadata_updated
+            > MICRO_METADATA_REFRESH.total_seconds()
+        )
+
+    def _metadata_pending(self, station_id, now: float) -> bool:
+        """Return True unless a station was not found and is backing off."""
+        missing = self._missing.get(station_id)
+        return missing is None or now >= missing[1]
+
+    def _record_missing(self, station_ids) -> None:
+        """Back off the metadata queries of stations the server did not return."""
+        for station_id in station_ids:
+            misses = self._missing.get(station_id, (0, 0.0))[0] + 1
+            delay = min(
+                MICRO_METADATA_REFRESH * 2 ** (misses - 1), MICRO_MISSING_MAX_BACKOFF
+            )
+            self._missing[station_id] = (
+                misses, time.monotonic() + delay.total_seconds()
+            )
+            if misses == 1:
+                _LOGGER.warning(
+                    "Micro Sensor %s not found, retrying in %s", station_id, delay
+                )
 
     async def _get_data(self):
-        """Fetch the micro sensor data from the API."""
+        """Fetch the micro sensor data in concurrent batches."""
+        now = dt_util.utcnow()
+        monotonic = time.monotonic()
+        refresh_metadata = self._metadata_expired()
+        if refresh_metadata:
+            metadata_ids = [
+                station_id for station_id in self.station_ids
+                if self._metadata_pending(station_id, monotonic)
+            ]
+            observation_ids = []
+        else:
+            # 新增或重試時間已到的站點查詢 Thing, 其餘只查詢預期已有新觀測值的站點
+            metadata_ids = [
+                station_id for station_id in self.station_ids
+                if station_id not in self._things
+                and self._metadata_pending(station_id, monotonic)
+            ]
+            observation_ids = [
+                station_id
+                for station_id in self._scheduler.due(self.station_ids, now)
+                if station_id in self._things
+            ]
+
+        jobs = [
+            (fetch, station_ids[i:i + self.batch_size])
+            for fetch, station_ids in (
+                (self._fetch_things, metadata_ids),
+                (self._fetch_observations, observation_ids),
+            )
+            for i in range(0, len(station_ids), self.batch_size)
+        ]
+        if not jobs:
+            if refresh_metadata:
+                self._metadata_updated = time.monotonic()
+            if not (data := self._build_data(set())):
+                raise DataNotFoundError({"name": "Micro_Sensor"})
+            return data
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(fetch, batch):
+            async with semaphore:
+                return await fetch(batch)
+
+        results = await asyncio.gather(
+            *(run(fetch, batch) for fetch, batch in jobs), return_exceptions=True
+        )
+
+        stale = set()
+        errors = []
+        for (_, batch), result in zip(jobs, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                errors.append(result)
+                # 僅將失敗批次的站點標記為過期
+                stale.update(batch)
+                continue
+            for station_id in batch:
+                if station_id in self._things:
+                    self._scheduler.observe(
+                        station_id, self._latest_time(station_id), now
+                    )
+
+        if len(errors) == len(jobs):
+            raise errors[0]
+        if errors:
+            _LOGGER.warning(
+                "%d of %d Micro Sensor batches failed: %s",
+                len(errors),
+                len(jobs),
+                errors[0],
+            )
+        if refresh_metadata:
+            self._metadata_updated = time.monotonic()
+
+        if not (data := self._build_data(stale)):
+            raise DataNotFoundError({"name": "Micro_Sensor"})
+        return data
+
+    def _latest_time(self, station_id):
+        """Return the newest observation time of a station."""
+        if (thing := self._things.get(station_id)) is None:
+            return None
+
+        return max(
+            (
+                parsed
+                for datastream_id in thing["datastreams"]
+                if (observation := self._observations.get(datastream_id))
+                and (parsed := self._observation_time(datastream_id, observation[1]))
+            ),
+            default=None,
+        )
+
+    def _build_data(self, stale: set) -> dict:
+        """Combine cached metadata and observations into coordinator data."""
+        data = {}
+        now = dt_util.utcnow()
+        for station_id in self.station_ids:
+            if (thing := self._things.get(station_id)) is None:
+                continue
+
+            station = {k: v for k, v in thing.items() if k != "datastreams"}
+            for datastream_id, sensor_type in thing["datastreams"].items():
+                if (observation := self._observations.get(datastream_id)) is None:
+                    continue
+                result, phenomenon_time = observation
+                station[sensor_type] = result
+                station[f"{sensor_type}_time"] = self._observation_time(
+                    datastream_id, phenomenon_time
+                )
+
+            self._add_averages(station_id, station, now)
+            if station_id in stale:
+                station["stale"] = True
+            data[station_id] = station
+        return data
+
+    def _add_averages(self, station_id, station, now: datetime) -> None:
+        """Feed the latest PM2.5 observation and add the derived values."""
+        if (observed := station.get("pm2.5_time")) is not None:
+            self._averages.observe(station_id, observed, station.get("pm2.5"))
+
+        # 平均值每小時更新一次, 以該小時結束的時間作為更新時間
+        hour = self._averages.hour(station_id)
+        for sensor_type, value in self._averages.values(station_id, now).items():
+            station[sensor_type] = value
+            station[f"{sensor_type}_time"] = hour
+
+    async def _fetch_things(self, station_ids):
+        """Fetch Things with metadata and latest Observations for one batch."""
         filter_params = " or ".join(
             MICRO_API_FILTER_PARAMS.format(stationID=stationID) 
-            for stationID in self.station_ids
+            for stationID in station_ids
         )
         url = MICRO_DATA_API_URL.format(filter_params=filter_params)
+        parsed_data = await self._request_json(url, self._parse_thing_data)
+
+        # 伺服器沒有回傳的站點延後再查, 不讓每次輪詢都改為完整查詢
+        if parsed_data is None:
+            raise DataNotFoundError({"name": "Micro_Sensor"})
+
+        self._record_missing(
+            station_id for station_id in station_ids
+            if station_id not in parsed_data[0]
+        )
+
+        things, observations = parsed_data
+        for station_id in things:
+            self._missing.pop(station_id, None)
+        self._things.update(things)
+        self._observations.update(observations)
+        _LOGGER.debug(
+            "Successfully fetched metadata for Micro Sensor %s", list(things)
+        )
+
+    async def _fetch_observations(self, station_ids):
+        """Fetch only Observations newer than the last one seen for one batch."""
+        datastream_ids = [
+            datastream_id
+            for station_id in station_ids
+            if (thing := self._things.get(station_id))
+            for datastream_id in thing["datastreams"]
+        ]
+        if not datastream_ids:
+            return
+
+        # 以此批次中最舊的觀測時間作為下限
+        seen = [
+            self._observations[datastream_id][1]
+            for datastream_id in datastream_ids
+            if datastream_id in self._observations
+        ]
+        obs_filter = (
+            f"$filter=phenomenonTime gt {min(seen)};"
+            if len(seen) == len(datastream_ids) and all(seen)
+            else ""
+        )
+        filter_params = " or ".join(
+            MICRO_DATASTREAM_FILTER_PARAMS.format(datastreamID=datastream_id)
+            for datastream_id in datastream_ids
+        )
+        url = MICRO_OBSERVATIONS_API_URL.format(
+            filter_params=filter_params, obs_filter=obs_filter
+        )
+        observations = await self._request_json(url, self._parse_observations)
+
+        updated = 0
+        for datastream_id, (result, phenomenon_time) in observations.items():
+            previous = self._observations.get(datastream_id)
+            if previous is None or (phenomenon_time or "") > (previous[1] or ""):
+                self._observations[datastream_id] = (result, phenomenon_time)
+                updated += 1
+
+        _LOGGER.debug(
+            "Fetched %d new observations for Micro Sensor %s", updated, station_ids
+        )
+
+    async def _request_json(self, url, parse):
+        """Request a SensorThings URL, decode and parse it in the executor."""
         headers = {
             "Accept": "application/json",
             "User-Agent": HA_USER_AGENT,
@@ -302,23 +1091,17 @@ class MicroSensorCoordinator(baseCoordinator):
             )
 
             if response.is_success:
-                res_data = response.json()
-
-                parsed_data = self._parse_thing_data(res_data)
-                if parsed_data:
-                    _LOGGER.debug(
-                        "Successfully fetched data for Micro Sensor %s",
-                        self.station_ids,
-                    )
-                    return parsed_data
-                else:
-                    raise DataNotFoundError(err)
+                # 解碼與解析不在事件迴圈上執行
+                return await self.hass.async_add_executor_job(
+                    self._decode_and_parse, response.content, parse
+                )
             else:
                 err["code"] = response.status_code
+                err["retry_after"] = parse_retry_after(
+                    response.headers.get("Retry-After")
+                )
                 raise UnexpectedStatusError(err)
 
-        except DataNotFoundError as e:
-            raise
         except UnexpectedStatusError as e:
             raise
         except asyncio.TimeoutError as e:
@@ -328,29 +1111,39 @@ class MicroSensorCoordinator(baseCoordinator):
             err["exception"] = str(e)
             raise RequestFailedError(err) from e
 
-    def _parse_thing_data(self, res_data):
-        """Parse Thing data and extract sensor values."""
-        # 感測器名稱映射表
-        sensor_mapping = {
-            "pm2.5": ["pm2.5", "pm25", "PM2.5", "PM25"],
-            "pm10": ["pm10", "PM10"],
-            "pm1": ["pm1", "PM1"],
-            "temperature": ["temperature", "Temperature"],
-            "humidity": ["humidity", "Humidity"],
-            "co": ["co", "CO"],
-            "o3": ["o3", "O3"],
-            "no2": ["no2", "NO2"],
-            "voc": ["voc", "tvoc", "TVOC"],
-        }
+    @staticmethod
+    def _decode_and_parse(content, parse):
+        """Decode a JSON payload and parse it, run in the executor."""
+        return parse(json_loads(content))
+
+    @staticmethod
+    def _parse_observations(res_data) -> dict:
+        """Parse the latest Observation of each Datastream."""
+        observations = {}
+        for datastream in res_data.get("value") or []:
+            if (
+                not (items := datastream.get("Observations"))
+                or (datastream_id := datastream.get("@iot.id")) is None
+            ):
+                continue
+            observations[datastream_id] = (
+                items[0].get("result"),
+                items[0].get("phenomenonTime"),
+            )
+        return observations
 
+    def _parse_thing_data(self, res_data):
+        """Parse Thing data into metadata and latest observations."""
         try:
+            # 查無任何 Thing 時回傳空結果, 由呼叫端記錄查無的站點
             if (
                 res_data.get("@iot.count", 0) == 0 
                 or not (value := res_data.get("value"))
             ):
-                raise DataNotFoundError({"name": "Micro_Sensor"})
+                return {}, {}
             
-            result = {}
+            things = {}
+            observations = {}
             for data in value:
                 if (
                     not (properties := data.get("properties"))
@@ -359,85 +1152,59 @@ class MicroSensorCoordinator(baseCoordinator):
                 ):
                     continue
 
-                result[station_id] = {
+                coords = parse_micro_coordinates(data.get("Locations"))
+                thing = things[station_id] = {
                     "thing_id": data.get("@iot.id"),
                     "stationID": properties.get("stationID"),
                     "Description": properties.get("Description"),
                     "areaType": properties.get("areaType"),
                     "areaDescription": properties.get("areaDescription"),
                     "authority": properties.get("authority"),
+                    "longitude": coords["lon"],
+                    "latitude": coords["lat"],
+                    "datastreams": {},
                 }
-                
-                coords = self._parse_coordinates(data.get("Locations"))
-                result[station_id]["longitude"] = coords["lon"]
-                result[station_id]["latitude"] = coords["lat"]
 
                 # 解析 Datastreams
-                if not (datastreams := data.get("Datastreams")):
-                    continue
+                for datastream in data.get("Datastreams") or []:
+                    if (datastream_id := datastream.get("@iot.id")) is None:
+                        continue
 
-                for datastream in datastreams:
-                    if not (observations := datastream.get("Observations")):
+                    # 依名稱分類, 結果由 classify_datastream 的 lru_cache 快取
+                    if (
+                        sensor_type := classify_datastream(datastream.get("name", ""))
+                    ) is None:
                         continue
+                    thing["datastreams"][datastream_id] = sensor_type
 
-                    name = datastream.get("name", "").lower()
-                    latest_obs = observations[0]
-                    value = latest_obs.get("result")
-                    fresh_time = self._parse_datetime(
-                        latest_obs.get("phenomenonTime")
-                    )
+                    if latest_obs := (datastream.get("Observations") or [None])[0]:
+                        observations[datastream_id] = (
+                            latest_obs.get("result"),
+                            latest_obs.get("phenomenonTime"),
+                        )
 
-                    # 根據映射表匹配感測器類型
-                    for sensor_type, keywords in sensor_mapping.items():
-                        if any(keyword in name for keyword in keywords):
-                            # 排除特殊情況
-                            if sensor_type == "temperature" and "main" in name:
-                                continue
-                            if sensor_type == "humidity" and "main" in name:
-                                continue
-                            if sensor_type == "co" and "voc" in name:
-                                continue
-
-                            result[station_id][sensor_type] = value
-                            result[station_id][f"{sensor_type}_time"] = fresh_time
-                            break
-
-            return result
+            return things, observations
         except Exception as e:
             _LOGGER.error("Error parsing thing data: %s", e)
             return None
 
-    def _parse_coordinates(self, locations):
-        """Parse coordinates and determine latitude and longitude."""
-        if (
-            not locations 
-            or not (coords := locations[0].get("location", {}).get("coordinates"))
-            or len(coords) < 2
-        ):
-            return {"lat": "unknown", "lon": "unknown"}
-
-        lat_range = (10.36, 26.40)  # 緯度範圍
-        lon_range = (114.35, 122.11)  # 經度範圍
-
-        a, b = coords[0], coords[1]
-
-        if lat_range[0] <= a <= lat_range[1] and lon_range[0] <= b <= lon_range[1]:
-            return {"lat": a, "lon": b}
-        elif lat_range[0] <= b <= lat_range[1] and lon_range[0] <= a <= lon_range[1]:
-            return {"lat": b, "lon": a}
-        else:
-            return {"lat": "unknown", "lon": "unknown"}
-
     def _parse_datetime(self, datetime_str):
-        """Parse datetime string and return local datetime string."""
+        """Parse an ISO datetime string, return None when invalid."""
         if not datetime_str:
-            return "unknown"
+            return None
 
         try:
-            utc_dt = parse_datetime(datetime_str)
-            local_dt = as_local(utc_dt)
-            return local_dt.strftime("%Y-%m-%d %H:%M:%S")
+            return parse_datetime(datetime_str)
         except Exception as e:
             _LOGGER.error("Error parsing datetime: %s", e)
-            return "unknown"
+            return None
+
+    def _observation_time(self, datastream_id, datetime_str):
+        """Return the parsed time of an observation, parsing only new values."""
+        cached = self._parsed_times.get(datastream_id)
+        if cached is not None and cached[0] == datetime_str:
+            return cached[1]
 
+        parsed = self._parse_datetime(datetime_str)
+        self._parsed_times[datastream_id] = (datetime_str, parsed)
+        return parsed
@@ -0,0 +1,35 @@
+"""Diagnostics support for Taiwan AQM integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, DOMAIN, MICRO_COORDINATOR, SITE_COORDINATOR
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    coordinators = {}
+
+    for key in (SITE_COORDINATOR, MICRO_COORDINATOR):
+        if (coordinator := entry_data.get(key)) is None:
+            continue
+        coordinators[coordinator.name] = {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "retry_policy": coordinator.retry_policy.as_dict(),
+            **coordinator.diagnostics(),
+        }
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinators": coordinators,
+    }
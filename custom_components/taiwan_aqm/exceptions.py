@@ -35,3 +35,7 @@ class RequestTimeoutError(TaiwanAQMError):
 
 class RequestFailedError(TaiwanAQMError):
     """Request failed"""
+
+
+class CircuitOpenError(TaiwanAQMError):
+    """Requests are paused after repeated failures"""
@@ -0,0 +1,111 @@
+"""Geographic helpers for Taiwan AQM integration."""
+from __future__ import annotations
+
+import heapq
+import math
+
+KM_PER_DEGREE = 111.32
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GeoGrid:
+    """Points bucketed into a fixed-size latitude/longitude grid.
+
+    Nearest queries search ring by ring outward from the query cell and
+    stop once nothing outside the searched rings can be closer.
+    """
+
+    def __init__(self, points, cell_degrees: float) -> None:
+        """Index (key, latitude, longitude) points."""
+        self._cell_degrees = cell_degrees
+        self._cells: dict[tuple[int, int], list[tuple[str, float, float]]] = {}
+        self._count = 0
+        for key, latitude, longitude in points:
+            self._cells.setdefault(self._cell(latitude, longitude), []).append(
+                (key, latitude, longitude)
+            )
+            self._count += 1
+
+        rows = [row for row, _ in self._cells] or [0]
+        cols = [col for _, col in self._cells] or [0]
+        self._bounds = (min(rows), max(rows), min(cols), max(cols))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        """Return the grid cell containing a point."""
+        return (
+            math.floor(latitude / self._cell_degrees),
+            math.floor(longitude / self._cell_degrees),
+        )
+
+    def nearest(
+        self, latitude: float, longitude: float, count: int
+    ) -> list[tuple[str, float]]:
+        """Return up to count (key, km) pairs closest to a point."""
+        if not self._cells or count <= 0:
+            return []
+
+        row, col = self._cell(latitude, longitude)
+        min_row, max_row, min_col, max_col = self._bounds
+        max_ring = max(row - min_row, max_row - row, col - min_col, max_col - col)
+        found: list[tuple[float, str]] = []
+        visited = 0
+
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(row, col, ring):
+                found.extend(
+                    (distance_km(latitude, longitude, lat, lon), key)
+                    for key, lat, lon in self._cells.get(cell, ())
+                )
+            visited += max(1, 8 * ring)
+
+            # 格網外的點距離至少為 ring 格, 已找到的足夠近時停止
+            if len(found) >= count:
+                found = heapq.nsmallest(count, found)
+                if found[-1][0] <= self._ring_distance(latitude, ring):
+                    break
+            # 查詢點離所有點太遠時, 逐格搜尋不如直接比較所有點
+            if visited > 4 * len(self._cells):
+                found = [
+                    (distance_km(latitude, longitude, lat, lon), key)
+                    for points in self._cells.values()
+                    for key, lat, lon in points
+                ]
+                break
+
+        return [(key, distance) for distance, key in heapq.nsmallest(count, found)]
+
+    @staticmethod
+    def _ring_cells(row: int, col: int, ring: int):
+        """Yield the grid cells at exactly ring steps from the center."""
+        if ring == 0:
+            yield row, col
+            return
+        for offset in range(-ring, ring + 1):
+            yield row - ring, col + offset
+            yield row + ring, col + offset
+        for offset in range(-ring + 1, ring):
+            yield row + offset, col - ring
+            yield row + offset, col + ring
+
+    def _ring_distance(self, latitude: float, ring: int) -> float:
+        """Return a lower bound in km for points outside the searched rings."""
+        # 經度一度的距離隨緯度縮短, 以搜尋範圍內最高緯度估計
+        edge = min(abs(latitude) + (ring + 1) * self._cell_degrees, 89.0)
+        return (
+            ring * self._cell_degrees * KM_PER_DEGREE * math.cos(math.radians(edge))
+        )
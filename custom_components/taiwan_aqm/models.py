@@ -0,0 +1,100 @@
+"""Data models for Taiwan AQM integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from .const import SENSOR_INFO
+
+# 僅保留感測器需要的欄位
+SITE_TEXT_FIELDS = frozenset({"pollutant", "status", "publishtime"})
+SITE_FIELDS = tuple(
+    aq_type for aq_type in SENSOR_INFO
+    if aq_type not in ("temperature", "humidity")
+) + ("longitude", "latitude")
+SITE_FIELD_INDEX = {field: index for index, field in enumerate(SITE_FIELDS)}
+_TEXT_MASK = tuple(field in SITE_TEXT_FIELDS for field in SITE_FIELDS)
+
+
+def _to_float(text: str) -> float | None:
+    """Convert a CSV cell to float, return None for blank or invalid cells."""
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def site_projection(header: list[str]) -> tuple[int, ...]:
+    """Map every site field to its column index in the CSV header (-1 if absent)."""
+    columns = {name: index for index, name in enumerate(header)}
+    return tuple(columns.get(field, -1) for field in SITE_FIELDS)
+
+
+class SiteRecord:
+    """Compact, typed record of one monitoring site.
+
+    Values are stored in a tuple ordered like ``SITE_FIELDS``; numeric
+    columns are converted to float once at parse time.
+    """
+
+    __slots__ = ("site_id", "_values")
+
+    def __init__(self, site_id: str, values: tuple) -> None:
+        """Initialize the record."""
+        self.site_id = site_id
+        self._values = values
+
+    @classmethod
+    def from_row(
+        cls, site_id: str, row: list[str], projection: tuple[int, ...]
+    ) -> SiteRecord:
+        """Build a record from a split CSV row."""
+        values = []
+        for index, is_text in zip(projection, _TEXT_MASK):
+            cell = row[index].strip() if index >= 0 else ""
+            if not cell:
+                values.append(None)
+            elif is_text:
+                values.append(cell)
+            else:
+                values.append(_to_float(cell))
+        return cls(site_id, tuple(values))
+
+    @classmethod
+    def from_json(cls, site_id: str, values: list) -> SiteRecord | None:
+        """Rebuild a record from ``to_json`` output, None if the layout changed."""
+        if not isinstance(values, list) or len(values) != len(SITE_FIELDS):
+            return None
+        return cls(site_id, tuple(values))
+
+    def to_json(self) -> list:
+        """Return the values as a JSON-serializable list."""
+        return list(self._values)
+
+    def diff(self, other: SiteRecord) -> tuple[str, ...]:
+        """Return the fields whose value differs from another record."""
+        return tuple(
+            field
+            for field, value, previous in zip(SITE_FIELDS, self._values, other._values)
+            if value != previous
+        )
+
+    def items(self):
+        """Return the (field, value) pairs, mimicking ``dict.items``."""
+        return zip(SITE_FIELDS, self._values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value of a field, mimicking ``dict.get``."""
+        if (index := SITE_FIELD_INDEX.get(key)) is None:
+            return self.site_id if key == "siteid" else default
+        value = self._values[index]
+        return default if value is None else value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SiteRecord):
+            return NotImplemented
+        return self.site_id == other.site_id and self._values == other._values
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SiteRecord({self.site_id}, {dict(zip(SITE_FIELDS, self._values))})"
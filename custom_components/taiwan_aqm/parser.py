@@ -0,0 +1,244 @@
+"""Response parsers for Taiwan AQM integration."""
+from __future__ import annotations
+
+import csv
+import functools
+import json
+import logging
+
+from .exceptions import ApiAuthError, RecordNotFoundError
+from .models import SiteRecord, site_projection
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+SITE_ID_COLUMN = "siteid"
+AUTH_ERROR_KEYWORDS = ("不存在", "過期", "失效", "無效", "expired", "invalid")
+_BOM = b"\xef\xbb\xbf"
+
+# 微型感測器 Datastream 名稱關鍵字: (感測器類型, 關鍵字, 排除字)
+MICRO_SENSOR_KEYWORDS = (
+    ("pm2.5", ("pm2.5", "pm25"), ()),
+    ("pm10", ("pm10",), ()),
+    ("pm1", ("pm1",), ()),
+    ("temperature", ("temperature",), ("main",)),
+    ("humidity", ("humidity",), ("main",)),
+    ("co", ("co",), ("voc",)),
+    ("o3", ("o3",), ()),
+    ("no2", ("no2",), ()),
+    ("voc", ("voc", "tvoc"), ()),
+)
+
+
+def _decode(raw: bytes) -> str:
+    """Decode a single CSV line from the Site API."""
+    # 嘗試不同的編碼方式
+    for encoding in ("utf-8", "big5"):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+def json_loads(content: bytes):
+    """Decode JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def parse_site_coordinates(content: bytes) -> dict[str, tuple[float, float]]:
+    """Return the (longitude, latitude) of every site in a Site API CSV."""
+    coordinates = {}
+    for row in csv.DictReader(_decode(content.removeprefix(_BOM)).splitlines()):
+        site_id = (row.get(SITE_ID_COLUMN) or "").strip()
+        try:
+            longitude = float(row["longitude"])
+            latitude = float(row["latitude"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if site_id:
+            coordinates.setdefault(site_id, (longitude, latitude))
+    return coordinates
+
+
+def parse_micro_coordinates(locations) -> dict:
+    """Parse Thing Locations and determine latitude and longitude."""
+    if (
+        not locations
+        or not (coords := locations[0].get("location", {}).get("coordinates"))
+        or len(coords) < 2
+    ):
+        return {"lat": "unknown", "lon": "unknown"}
+
+    lat_range = (10.36, 26.40)  # 緯度範圍
+    lon_range = (114.35, 122.11)  # 經度範圍
+
+    a, b = coords[0], coords[1]
+
+    if lat_range[0] <= a <= lat_range[1] and lon_range[0] <= b <= lon_range[1]:
+        return {"lat": a, "lon": b}
+    elif lat_range[0] <= b <= lat_range[1] and lon_range[0] <= a <= lon_range[1]:
+        return {"lat": b, "lon": a}
+    else:
+        return {"lat": "unknown", "lon": "unknown"}
+
+
+def parse_station_page(content: bytes) -> tuple[list[list], str | None]:
+    """Parse one page of the Things listing.
+
+    Returns [stationID, thing ID, areaDescription, longitude, latitude]
+    rows and the link to the next page.
+    """
+    res_data = json_loads(content)
+    stations = []
+    for thing in res_data.get("value") or []:
+        if (
+            not (properties := thing.get("properties"))
+            or not (station_id := properties.get("stationID"))
+        ):
+            continue
+
+        coords = parse_micro_coordinates(thing.get("Locations"))
+        located = coords["lat"] != "unknown"
+        stations.append([
+            str(station_id),
+            thing.get("@iot.id"),
+            properties.get("areaDescription") or "",
+            coords["lon"] if located else None,
+            coords["lat"] if located else None,
+        ])
+    return stations, res_data.get("@iot.nextLink")
+
+
+@functools.lru_cache(maxsize=1024)
+def classify_datastream(name: str) -> str | None:
+    """Return the sensor type of a Datastream name, or None if unknown."""
+    name = name.lower()
+    for sensor_type, keywords, excludes in MICRO_SENSOR_KEYWORDS:
+        if any(keyword in name for keyword in keywords) and not any(
+            exclude in name for exclude in excludes
+        ):
+            return sensor_type
+    return None
+
+
+def _split_row(line: str) -> list[str]:
+    """Split one CSV line into fields."""
+    return next(csv.reader([line]), [])
+
+
+class SiteCsvStreamParser:
+    """Incrementally parse the Site API CSV, keeping only wanted sites.
+
+    Bytes are fed as they arrive. The header is read once, and each row's
+    site ID is checked before the row is split into fields, so only the
+    configured sites are ever materialized. Parsing reports completion as
+    soon as every wanted site has been seen.
+    """
+
+    def __init__(self, site_ids) -> None:
+        """Initialize the parser."""
+        self._wanted = {str(site_id) for site_id in site_ids}
+        self._buffer = b""
+        self._header: list[str] | None = None
+        self._projection: tuple[int, ...] = ()
+        self._siteid_index = -1
+        self._siteid_last = False
+        self.records: dict[str, SiteRecord] = {}
+        self.row_count = 0
+
+    @property
+    def done(self) -> bool:
+        """Return True once every wanted site has been parsed."""
+        return self._header is not None and len(self.records) >= len(self._wanted)
+
+    @property
+    def first_publishtime(self) -> str | None:
+        """Return the publishtime of the first matched row."""
+        for record in self.records.values():
+            return record.get("publishtime")
+        return None
+
+    def feed(self, chunk: bytes) -> bool:
+        """Feed a chunk of bytes, return True when parsing can stop."""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b"\n")
+
+        for line in lines:
+            self._parse_line(line)
+            if self.done:
+                return True
+        return False
+
+    def close(self) -> None:
+        """Parse whatever is left in the buffer."""
+        if self._buffer:
+            self._parse_line(self._buffer)
+            self._buffer = b""
+
+        if self._header is None:
+            _LOGGER.warning("Received empty CSV in Site API response")
+            raise RecordNotFoundError({"name": "Site"})
+
+    def _parse_line(self, raw: bytes) -> None:
+        """Parse one raw CSV line."""
+        line = raw.rstrip(b"\r")
+        if not line.strip():
+            return
+
+        if self._header is None:
+            self._parse_header(line)
+            return
+
+        self.row_count += 1
+        site_id = self._peek_site_id(line)
+        if site_id not in self._wanted or site_id in self.records:
+            return
+
+        row = _split_row(_decode(line))
+        if len(row) != len(self._header):
+            _LOGGER.debug("Skip malformed CSV row for site %s", site_id)
+            return
+
+        self.records[site_id] = SiteRecord.from_row(site_id, row, self._projection)
+
+    def _parse_header(self, line: bytes) -> None:
+        """Parse the header row and locate the site ID column."""
+        text = _decode(line.removeprefix(_BOM))
+        header = [field.strip() for field in _split_row(text)]
+
+        if SITE_ID_COLUMN not in header:
+            # 非 CSV 格式的回應, 通常是 API key 錯誤訊息
+            snippet = text[:200]
+            if any(keyword in snippet.lower() for keyword in AUTH_ERROR_KEYWORDS):
+                _LOGGER.error(
+                    "Detected possible auth issue in Site API response: %s",
+                    snippet[:100],
+                )
+                raise ApiAuthError({"name": "Site"})
+
+            _LOGGER.warning("Unexpected Site API response: %s", snippet[:100])
+            raise RecordNotFoundError({"name": "Site"})
+
+        self._header = header
+        self._projection = site_projection(header)
+        self._siteid_index = header.index(SITE_ID_COLUMN)
+        self._siteid_last = self._siteid_index == len(header) - 1
+
+    def _peek_site_id(self, line: bytes) -> str:
+        """Return the site ID of a row without splitting every field."""
+        if self._siteid_last:
+            return line.rpartition(b",")[2].strip(b'" ').decode(
+                "ascii", errors="replace"
+            )
+
+        row = _split_row(_decode(line))
+        if len(row) <= self._siteid_index:
+            return ""
+        return row[self._siteid_index].strip()
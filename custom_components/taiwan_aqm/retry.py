@@ -0,0 +1,248 @@
+"""Retry policy for Taiwan AQM API requests."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import random
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, TypeVar
+
+from homeassistant.util import dt as dt_util
+
+from .exceptions import (
+    ApiAuthError,
+    CircuitOpenError,
+    DataNotFoundError,
+    RecordNotFoundError,
+    RequestFailedError,
+    RequestTimeoutError,
+    UnexpectedStatusError,
+)
+
+_LOGGER = logging.getLogger(__name__)
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header into seconds."""
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - dt_util.utcnow()).total_seconds(), 0.0)
+
+
+@dataclass(frozen=True, slots=True)
+class RetryDecision:
+    """A single decision taken by a retry policy."""
+
+    time: datetime
+    action: str
+    attempt: int
+    delay: float = 0.0
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the decision as a dict."""
+        return {**asdict(self), "time": self.time.isoformat()}
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter, Retry-After and a circuit breaker.
+
+    A failed update is one where every attempt failed. After
+    ``failure_threshold`` consecutive failed updates, or when the server
+    asks to wait longer than ``max_delay``, the circuit opens and requests
+    are skipped until the cool-down has passed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 30.0,
+        failure_threshold: int = 3,
+        cooldown: timedelta = timedelta(minutes=15),
+        history: int = 50,
+    ) -> None:
+        """Initialize the retry policy."""
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.open_until: datetime | None = None
+        self.decisions: deque[RetryDecision] = deque(maxlen=history)
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while the circuit is open."""
+        return self.open_until is not None and dt_util.utcnow() < self.open_until
+
+    def _record(self, action: str, attempt: int, **kwargs: Any) -> None:
+        """Record a decision."""
+        self.decisions.append(
+            RetryDecision(dt_util.utcnow(), action, attempt, **kwargs)
+        )
+
+    def before_request(self) -> None:
+        """Raise CircuitOpenError while the circuit is open."""
+        if self.is_open:
+            self._record("skip", 0)
+            raise CircuitOpenError(
+                {"name": self.name, "until": self.open_until.isoformat()}
+            )
+
+    def next_delay(self, attempt: int, error: Exception) -> float | None:
+        """Return the delay before the next attempt, or None to give up."""
+        if attempt + 1 >= self.max_attempts:
+            self._record("give_up", attempt, error=str(error))
+            return None
+
+        if (retry_after := error["retry_after"]) is not None:
+            if retry_after > self.max_delay:
+                self._record(
+                    "give_up", attempt, delay=retry_after, error=str(error)
+                )
+                return None
+            delay = retry_after
+        else:
+            # Full jitter
+            delay = random.uniform(
+                0, min(self.max_delay, self.base_delay * 2 ** attempt)
+            )
+
+        self._record("retry", attempt, delay=delay, error=str(error))
+        return delay
+
+    def record_success(self, attempt: int) -> None:
+        """Reset the failure counter after a successful attempt."""
+        self.consecutive_failures = 0
+        self.open_until = None
+        self._record("success", attempt)
+
+    def record_failure(self, error: Exception | None) -> bool:
+        """Record a failed update, return True if the circuit just opened."""
+        self.consecutive_failures += 1
+        retry_after = error["retry_after"] if error is not None else None
+
+        cooldown = self.cooldown
+        if retry_after is not None and retry_after > self.max_delay:
+            cooldown = max(cooldown, timedelta(seconds=retry_after))
+        elif self.consecutive_failures < self.failure_threshold:
+            return False
+
+        self.open_until = dt_util.utcnow() + cooldown
+        self._record("open", self.consecutive_failures, delay=cooldown.total_seconds())
+        _LOGGER.warning(
+            "%s API failed %d times in a row, pausing requests until %s",
+            self.name,
+            self.consecutive_failures,
+            self.open_until,
+        )
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the policy state for diagnostics."""
+        return {
+            "consecutive_failures": self.consecutive_failures,
+            "open_until": self.open_until.isoformat() if self.open_until else None,
+            "decisions": [decision.as_dict() for decision in self.decisions],
+        }
+
+
+def retry_on_failure():
+    """Retry decorator driven by the coordinator's ``retry_policy``."""
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            policy: RetryPolicy = self.retry_policy
+            policy.before_request()
+            last_error = None
+
+            for attempt in range(policy.max_attempts):
+                try:
+                    result = await func(self, *args, **kwargs)
+                    policy.record_success(attempt)
+                    return result
+                except ApiAuthError:
+                    raise
+                except DataNotFoundError as e:
+                    last_error = e
+                    _LOGGER.warning(
+                        "No valid data found in the %s API response. (%d/%d)",
+                        e["name"],
+                        attempt + 1,
+                        policy.max_attempts,
+                    )
+                except RecordNotFoundError as e:
+                    last_error = e
+                    _LOGGER.warning(
+                        "No records found in the %s API response. (%d/%d)",
+                        e["name"],
+                        attempt + 1,
+                        policy.max_attempts,
+                    )
+                except UnexpectedStatusError as e:
+                    last_error = e
+                    _LOGGER.warning(
+                        "%s API returned unexpected status code: %s. (%d/%d)",
+                        e["name"],
+                        e["code"],
+                        attempt + 1,
+                        policy.max_attempts,
+                    )
+                except RequestTimeoutError as e:
+                    last_error = e
+                    _LOGGER.warning(
+                        "%s API Request timed out: %s. (%d/%d)",
+                        e["name"],
+                        e["exception"],
+                        attempt + 1,
+                        policy.max_attempts,
+                    )
+                except RequestFailedError as e:
+                    last_error = e
+                    _LOGGER.warning(
+                        "%s API Request failed: %s. (%d/%d)",
+                        e["name"],
+                        e["exception"],
+                        attempt + 1,
+                        policy.max_attempts,
+                    )
+
+                if (delay := policy.next_delay(attempt, last_error)) is None:
+                    break
+                await asyncio.sleep(delay)
+
+            if policy.record_failure(last_error):
+                await self.hass.services.async_call(
+                    "notify",
+                    "persistent_notification",
+                    {
+                        "message": (
+                            f"Failed to fetch data from the {policy.name} API "
+                            f"{policy.consecutive_failures} times in a row. "
+                            f"Requests are paused until {policy.open_until}."
+                        ),
+                        "title": "Taiwan Air Quality Monitor Error",
+                    },
+                )
+            return None
+        return wrapper
+    return decorator
@@ -0,0 +1,216 @@
+"""Polling schedulers for Taiwan AQM integration."""
+from __future__ import annotations
+
+import logging
+import statistics
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+TAIPEI_TZ = dt_util.get_time_zone("Asia/Taipei")
+PUBLISHTIME_FORMATS = ("%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M", "%Y-%m-%d %H:%M:%S")
+
+
+def parse_publishtime(publishtime: str | None) -> datetime | None:
+    """Parse a Site API publishtime (Taiwan local time)."""
+    if not publishtime:
+        return None
+
+    for fmt in PUBLISHTIME_FORMATS:
+        try:
+            return datetime.strptime(publishtime, fmt).replace(tzinfo=TAIPEI_TZ)
+        except ValueError:
+            continue
+    return None
+
+
+class SitePublishScheduler:
+    """Learn when MOENV publishes hourly data and schedule polls around it.
+
+    Every time a new hour shows up, the delay between its publishtime and
+    the moment we saw it is recorded. The publish window is derived from
+    those delays: polls are frequent inside the window until the new hour
+    arrives, sparse after the window, and skipped until the next window
+    once the current hour has been received.
+    """
+
+    def __init__(
+        self,
+        fast_interval: timedelta = timedelta(minutes=2),
+        late_interval: timedelta = timedelta(minutes=5),
+        default_window: tuple[float, float] = (5.0, 25.0),
+        history: int = 24,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.fast_interval = fast_interval
+        self.late_interval = late_interval
+        self._default_window = default_window
+        self._delays: deque[float] = deque(maxlen=history)
+        self.latest: datetime | None = None
+
+    @property
+    def window(self) -> tuple[float, float]:
+        """Return the publish window in minutes after the hour."""
+        if len(self._delays) < 3:
+            return self._default_window
+
+        start = max(0.0, min(self._delays) - 2)
+        end = min(59.0, max(self._delays) + 3)
+        return start, max(end, start + 5)
+
+    def observe(self, publishtime: str | None, now: datetime) -> None:
+        """Record the newest publishtime seen at ``now``."""
+        if (published := parse_publishtime(publishtime)) is None:
+            return
+
+        if self.latest is not None and published > self.latest:
+            # 首次觀測無法得知實際發布時間, 僅記錄之後的換時
+            delay = (now - published).total_seconds() / 60
+            if 0 <= delay < 60:
+                self._delays.append(delay)
+                _LOGGER.debug(
+                    "Site data for %s seen %.1f minutes after the hour",
+                    published,
+                    delay,
+                )
+
+        if self.latest is None or published > self.latest:
+            self.latest = published
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """Return how long to wait before the next poll."""
+        start, end = self.window
+        hour = now.astimezone(TAIPEI_TZ).replace(minute=0, second=0, microsecond=0)
+        window_start = hour + timedelta(minutes=start)
+        window_end = hour + timedelta(minutes=end)
+
+        # 目前應該已發布的資料時段
+        expected = hour if now >= window_start else hour - timedelta(hours=1)
+
+        if self.latest is not None and self.latest >= expected:
+            next_window = (
+                window_start if now < window_start
+                else window_start + timedelta(hours=1)
+            )
+            return max(next_window - now, timedelta(minutes=1))
+
+        if window_start <= now <= window_end:
+            return self.fast_interval
+
+        if now < window_start:
+            return max(min(self.late_interval, window_start - now), timedelta(minutes=1))
+
+        return self.late_interval
+
+
+@dataclass(slots=True)
+class StationCadence:
+    """Learned reporting cadence of one micro sensor station."""
+
+    intervals: deque[float] = field(default_factory=lambda: deque(maxlen=8))
+    latest: datetime | None = None
+    next_due: datetime | None = None
+    misses: int = 0
+
+    @property
+    def interval(self) -> float | None:
+        """Return the median reporting interval in seconds."""
+        if not self.intervals:
+            return None
+        return statistics.median(self.intervals)
+
+
+class MicroStationScheduler:
+    """Learn how often each micro sensor station reports and poll accordingly.
+
+    The reporting interval of a station is the median gap between its
+    consecutive observation times. A station is polled again shortly after
+    its next observation is expected; while nothing new shows up the wait
+    doubles, up to ``max_interval``, so silent stations back off.
+    """
+
+    def __init__(
+        self,
+        min_interval: timedelta = timedelta(minutes=2),
+        max_interval: timedelta = timedelta(minutes=30),
+        grace: timedelta = timedelta(seconds=30),
+    ) -> None:
+        """Initialize the scheduler."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.grace = grace
+        self._stations: dict[str, StationCadence] = {}
+
+    def due(self, station_ids: list[str], now: datetime) -> list[str]:
+        """Return the stations that should be polled at ``now``."""
+        return [
+            station_id
+            for station_id in station_ids
+            if (cadence := self._stations.get(station_id)) is None
+            or cadence.next_due is None
+            or cadence.next_due <= now
+        ]
+
+    def observe(self, station_id: str, observed: datetime | None, now: datetime) -> None:
+        """Record the newest observation time of a polled station."""
+        cadence = self._stations.setdefault(station_id, StationCadence())
+
+        if observed is not None and (cadence.latest is None or observed > cadence.latest):
+            if cadence.latest is not None:
+                gap = (observed - cadence.latest).total_seconds()
+                if gap <= self.max_interval.total_seconds() * 2:
+                    cadence.intervals.append(gap)
+            cadence.latest = observed
+            cadence.misses = 0
+
+            if (interval := cadence.interval) is not None:
+                expected = observed + timedelta(seconds=interval) + self.grace
+                # 預期時間已過 (資料延遲) 時以最短間隔輪詢
+                cadence.next_due = max(expected, now + self.min_interval)
+                return
+        else:
+            cadence.misses += 1
+
+        # 尚未學到週期或沒有新資料: 以最短間隔起算並逐次加倍
+        backoff = self.min_interval * 2 ** max(cadence.misses - 1, 0)
+        cadence.next_due = now + min(backoff, self.max_interval)
+
+    def next_interval(self, station_ids: list[str], now: datetime) -> timedelta:
+        """Return how long to wait until the next station is due.
+
+        Only pass the stations that are polled for observations; stations
+        without metadata would otherwise pin the interval to the minimum.
+        """
+        pending = []
+        for station_id in station_ids:
+            cadence = self._stations.get(station_id)
+            if cadence is None or cadence.next_due is None:
+                return self.min_interval
+            pending.append(cadence.next_due)
+
+        # 沒有可輪詢的站點時不需頻繁喚醒
+        if not pending:
+            return self.max_interval
+        wait = min(pending) - now
+        return min(max(wait, timedelta(minutes=1)), self.max_interval)
+
+    def prune(self, station_ids) -> None:
+        """Forget the stations that are no longer configured."""
+        for station_id in self._stations.keys() - set(station_ids):
+            del self._stations[station_id]
+
+    def as_dict(self) -> dict[str, dict]:
+        """Return the learned cadences for diagnostics."""
+        return {
+            station_id: {
+                "interval": cadence.interval,
+                "latest": cadence.latest.isoformat() if cadence.latest else None,
+                "next_due": cadence.next_due.isoformat() if cadence.next_due else None,
+                "misses": cadence.misses,
+            }
+            for station_id, cadence in self._stations.items()
+        }
@@ -1,352 +1,313 @@
 from __future__ import annotations
 
+import functools
 import logging
 
-from homeassistant.components.sensor import RestoreSensor
+from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util.dt import as_local
 
 from .const import (
+    ADD_ENTITIES,
+    CONF_METADATA_ON_DEVICE,
     CONF_STATION_ID,
+    CONF_STRING_SENSORS,
     CONF_SITEID,
     DOMAIN,
+    MICRO_AVERAGE_SENSOR_INFO,
     MICRO_COORDINATOR,
+    MICRO_DERIVED_SENSOR_TYPES,
     SENSOR_INFO,
     SITE_COORDINATOR,
     SITENAME_DICT,
+    STRING_SENSOR_TYPES,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# 由 SENSOR_INFO 產生一次, 所有實體共用
+SENSOR_DESCRIPTIONS: dict[str, SensorEntityDescription] = {
+    aq_type: SensorEntityDescription(
+        key=aq_type,
+        device_class=config["device_class"],
+        native_unit_of_measurement=config["unit"],
+        state_class=config["state_class"],
+        suggested_display_precision=config["display_precision"],
+        icon=config["icon"],
+    )
+    for aq_type, config in {**SENSOR_INFO, **MICRO_AVERAGE_SENSOR_INFO}.items()
+}
+SITE_SENSOR_DESCRIPTIONS = tuple(
+    description for aq_type, description in SENSOR_DESCRIPTIONS.items()
+    if aq_type in SENSOR_INFO and aq_type not in ("temperature", "humidity")
+)
+NUMERIC_SITE_SENSOR_DESCRIPTIONS = tuple(
+    description for description in SITE_SENSOR_DESCRIPTIONS
+    if description.key not in STRING_SENSOR_TYPES
+)
+# 平均值與 AQI 由協調器從 PM2.5 觀測值計算, 不需額外的 API 請求
+MICRO_SENSOR_DESCRIPTIONS = tuple(
+    SENSOR_DESCRIPTIONS[aq_type]
+    for aq_type in ("pm2.5", "temperature", "humidity", *MICRO_DERIVED_SENSOR_TYPES)
+)
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Taiwan AQM sensors from a config entry."""
     try:
         entry_data = hass.data[DOMAIN][entry.entry_id]
+        if not entry.options.get(CONF_STRING_SENSORS, True):
+            _async_remove_string_sensors(hass, entry)
+
+        # 保存回呼, 新增 subentry 時直接加入實體而不需重新載入
+        entry_data[ADD_ENTITIES] = async_add_entities
 
-        for subentry_id, subentry in entry.subentries.items():
-            if not hasattr(subentry, 'subentry_type'):
-                continue
-
-            subentry_entities = []
-
-            # 處理標準監測站 subentry
-            if subentry.subentry_type == "site":
-                site_id = subentry.data.get(CONF_SITEID)
-                coordinator = entry_data.get(SITE_COORDINATOR)
-                site_name = SITENAME_DICT.get(site_id, f"Site {site_id}")
-                
-                subentry_entities.extend([
-                    SiteSensor(
-                        coordinator=coordinator,
-                        siteid=site_id,
-                        sitename=site_name,
-                        aq_type=aq_type,
-                        device_class=config["device_class"],
-                        unit_of_measurement=config["unit"],
-                        state_class=config["state_class"],
-                        display_precision=config["display_precision"],
-                        icon=config["icon"]
-                    ) for aq_type, config in SENSOR_INFO.items()
-                    if aq_type not in ["temperature", "humidity"]
-                ])
-
-            # 處理微型感測器 subentry
-            elif subentry.subentry_type == "micro_sensor":
-                station_id = subentry.data.get(CONF_STATION_ID)
-                coordinator = entry_data[MICRO_COORDINATOR]
-
-                subentry_entities.extend([
-                    MicroSensor(
-                        coordinator=coordinator,
-                        station_id=station_id,
-                        aq_type=aq_type,
-                        device_class=config["device_class"],
-                        unit_of_measurement=config["unit"],
-                        state_class=config["state_class"],
-                        display_precision=config["display_precision"],
-                        icon=config["icon"]
-                    ) for aq_type, config in SENSOR_INFO.items()
-                    if aq_type in ["pm2.5", "temperature", "humidity"]
-                ])
-
-            # 為這個 subentry 添加實體
-            if subentry_entities:
-                async_add_entities(subentry_entities, config_subentry_id=subentry_id)
-                _LOGGER.debug(
-                    "Added %d entities for subentry %s (type: %s)",
-                    len(subentry_entities),
-                    subentry_id,
-                    subentry.subentry_type
-                )
+        for subentry in entry.subentries.values():
+            async_add_subentry_entities(hass, entry, subentry)
 
     except Exception as e:
         _LOGGER.error("setup sensor error: %s", e, exc_info=True)
 
 
-class AQMbaseSensor(CoordinatorEntity, RestoreSensor):
-    """Representation of a Taiwan AQM base sensor."""
-
-    def __init__(
-        self,
-        coordinator,
-        station_or_site_id,
-        station_or_site_name,
-        aq_type,
-        device_class,
-        unit_of_measurement,
-        state_class,
-        display_precision,
-        icon,
-    ):
-        """Initialize the AQI sensor."""
-        super().__init__(coordinator)
-        self._station_or_site_id = station_or_site_id
-        self._station_or_site_name = station_or_site_name
-        self._aq_type = aq_type
-        self._device_class = device_class
-        self._unit_of_measurement = unit_of_measurement
-        self._state_class = state_class
-        self._display_precision = display_precision
-        self._icon = icon
-        self._last_value = None
-
-    async def async_added_to_hass(self):
-        """Get the old value"""
-        await super().async_added_to_hass()
+@callback
+def async_add_subentry_entities(hass, entry, subentry) -> None:
+    """Create and add the sensors of one subentry."""
+    if not hasattr(subentry, 'subentry_type'):
+        return
+
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    metadata_on_device = entry.options.get(CONF_METADATA_ON_DEVICE, False)
+    subentry_entities = []
+
+    # 處理標準監測站 subentry
+    if subentry.subentry_type == "site":
+        site_id = subentry.data.get(CONF_SITEID)
+        coordinator = entry_data.get(SITE_COORDINATOR)
+        site_name = SITENAME_DICT.get(site_id, f"Site {site_id}")
+        site_descriptions = (
+            SITE_SENSOR_DESCRIPTIONS
+            if entry.options.get(CONF_STRING_SENSORS, True)
+            else NUMERIC_SITE_SENSOR_DESCRIPTIONS
+        )
 
-        if (
-            (last_sensor_data := await self.async_get_last_sensor_data())
-            and last_sensor_data.native_value is not None
-            and self._device_class is not None
-        ):
-            self._last_value = last_sensor_data.native_value
-            _LOGGER.debug(
-                "Restored last value: %s for %s", self._last_value, self.name
+        subentry_entities.extend(
+            SiteSensor(
+                coordinator,
+                site_id,
+                site_name,
+                description,
+                metadata_on_device,
             )
+            for description in site_descriptions
+        )
 
-    @property
-    def _coordinator_data(self) -> dict:
-        return self.coordinator.data.get(self._station_or_site_id, {})
-    
-    @property
-    def _get_value(self):
-        return self._coordinator_data.get(self._aq_type)
+    # 處理微型感測器 subentry
+    elif subentry.subentry_type == "micro_sensor":
+        station_id = subentry.data.get(CONF_STATION_ID)
+        coordinator = entry_data[MICRO_COORDINATOR]
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, self._station_or_site_id)},
-            "name": (
-                f"TWAQ Monitor - {self._station_or_site_name}"
-                f"({self._station_or_site_id})"
-            ),
-            "manufacturer": "Taiwan Ministry of Environment Data Open Platform",
-            "model": "TaiwanAQM",
-        }
+        subentry_entities.extend(
+            MicroSensor(
+                coordinator, station_id, description, metadata_on_device
+            )
+            for description in MICRO_SENSOR_DESCRIPTIONS
+        )
 
-    @property
-    def device_class(self):
-        return self._device_class  # 設備類型
+    # 為這個 subentry 添加實體
+    if subentry_entities:
+        entry_data[ADD_ENTITIES](
+            subentry_entities, config_subentry_id=subentry.subentry_id
+        )
+        _LOGGER.debug(
+            "Added %d entities for subentry %s (type: %s)",
+            len(subentry_entities),
+            subentry.subentry_id,
+            subentry.subentry_type
+        )
 
-    @property
-    def native_unit_of_measurement(self):
-        return self._unit_of_measurement  # 預設單位
 
-    @property
-    def state_class(self):
-        return self._state_class  # 圖表類型
+@callback
+def _async_remove_string_sensors(hass, entry) -> None:
+    """Remove the disabled text sensors from the entity registry."""
+    entity_reg = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(entity_reg, entry.entry_id):
+        if entity.unique_id.endswith(
+            tuple(f"_{aq_type}" for aq_type in STRING_SENSOR_TYPES)
+        ):
+            entity_reg.async_remove(entity.entity_id)
+            _LOGGER.debug("Removed disabled text sensor %s", entity.entity_id)
 
-    @property
-    def suggested_display_precision(self):
-        return self._display_precision
 
-    @property
-    def icon(self):
-        return self._icon
+@functools.lru_cache(maxsize=None)
+def _device_info(station_or_site_id, station_or_site_name, **metadata) -> dict:
+    """Return the device info shared by all sensors of one site or station."""
+    return {
+        "identifiers": {(DOMAIN, station_or_site_id)},
+        "name": f"TWAQ Monitor - {station_or_site_name}({station_or_site_id})",
+        "manufacturer": "Taiwan Ministry of Environment Data Open Platform",
+        "model": "TaiwanAQM",
+        **metadata,
+    }
 
-    @property
-    def has_entity_name(self):
-        return False
 
-    @property
-    def available(self):
-        return self.coordinator.last_update_success
+class AQMbaseSensor(CoordinatorEntity, SensorEntity):
+    """Representation of a Taiwan AQM base sensor."""
 
-    @property
-    def name(self):
-        sensor_type = (
-            self._aq_type.replace("_", " ") if self._aq_type else "unknown"
-        )
+    _attr_has_entity_name = False
 
-        if "Micro Sensor" in self._station_or_site_name:
-            return (
-                f"{self._station_or_site_name}"
-                f"({self._station_or_site_id}) {sensor_type}"
+    def __init__(
+        self,
+        coordinator,
+        station_or_site_id,
+        station_or_site_name,
+        description: SensorEntityDescription,
+        device_metadata: dict | None = None,
+    ):
+        """Initialize the AQI sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._key = (station_or_site_id, description.key)
+
+        # 靜態資料只在初始化時建立一次
+        aq_type = description.key
+        sensor_type = aq_type.replace("_", " ")
+        if "Micro Sensor" in station_or_site_name:
+            self._attr_name = (
+                f"{station_or_site_name}({station_or_site_id}) {sensor_type}"
             )
         else:
-            return f"{self._station_or_site_name} {sensor_type}"
+            self._attr_name = f"{station_or_site_name} {sensor_type}"
+        self._attr_device_info = _device_info(
+            station_or_site_id, station_or_site_name, **(device_metadata or {})
+        )
 
     @property
     def unique_id(self):
-        sanitized_name = (
-            self._aq_type.replace(" ", "_") if self._aq_type else "unknown"
-        )
-        return f"{DOMAIN}_{self._station_or_site_id}_{sanitized_name}"
+        # 只在加入實體時讀取, 不需保存在每個實體上
+        station_or_site_id, aq_type = self._key
+        return f"{DOMAIN}_{station_or_site_id}_{aq_type.replace(' ', '_')}"
 
     @property
-    def native_value(self):
-        if self._is_valid_data() and self.coordinator.last_update_success:
-            return self._get_value
-        else:
-            return "unknown" if self._device_class is None else 0
-
-    def _is_valid_data(self) -> bool:
-        """Validate the integrity of the data."""
-        _type = (
-            "site"
-            if "Micro Sensor" not in self._station_or_site_name
-            else "micro sensor station"
-        )
+    def available(self):
+        # 首次刷新超過設定期限時實體先加入, 有資料前不寫入預設值
+        return super().available and self.coordinator.data is not None
 
-        if not self._coordinator_data:
-            _LOGGER.warning(
-                "The %s ID '%s' is not in the data: %s",
-                _type,
-                self._station_or_site_id,
-                list(self._coordinator_data.keys()),
-            )
-            return False
-
-        if (value := self._get_value) in [None, ""]:
-            if value is None:
-                _LOGGER.debug(
-                    "API exception, The value for '%s' in %s ID '%s' is missing or None.",
-                    self._aq_type,
-                    _type,
-                    self._station_or_site_id,
-                )
-            elif value == "":
-                _LOGGER.debug(
-                    "The value for '%s' in %s ID '%s' is empty",
-                    self._aq_type,
-                    _type,
-                    self._station_or_site_id,
-                )
-            return False
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when this sensor's data changed."""
+        changed = self.coordinator.changed_keys
+        if changed is not None and self._key not in changed:
+            return
+        super()._handle_coordinator_update()
 
-        _LOGGER.debug(
-            "Valid data found for %s ID'%s' and type '%s': %s",
-            _type,
-            self._station_or_site_id,
-            self._aq_type,
-            value,
-        )
-        return True
+    @property
+    def native_value(self):
+        # 協調器已預先驗證, 無效的值不會出現在 values 中
+        value = self.coordinator.values.get(self._key)
+        if value is None or not self.coordinator.last_update_success:
+            return "unknown" if self.entity_description.device_class is None else 0
+        return value
 
 
 class SiteSensor(AQMbaseSensor):
     """Representation of a Taiwan AQM Site Sensor."""
 
+    # 靜態屬性不寫入記錄器
+    _unrecorded_attributes = frozenset({"siteID", "longitude", "latitude"})
+
     def __init__(
-        self,
-        coordinator,
-        siteid,
-        sitename,
-        aq_type,
-        device_class,
-        unit_of_measurement=None,
-        state_class=None,
-        display_precision=None,
-        icon=None,
+        self, coordinator, siteid, sitename, description, metadata_on_device=False
     ):
         """Initialize the site sensor."""
         super().__init__(
             coordinator,
             siteid,
             sitename,
-            aq_type,
-            device_class,
-            unit_of_measurement,
-            state_class,
-            display_precision,
-            icon,
-        )
-
-        self._siteid = siteid
-        _LOGGER.debug(
-            "Initialized TaiwanAQMEntity for siteid: %s, type: %s",
-            self._siteid,
-            self._aq_type,
+            description,
+            {"serial_number": siteid} if metadata_on_device else None,
         )
 
     @property
     def extra_state_attributes(self):
-        if self._coordinator_data:
-            lon = self._coordinator_data.get("longitude", "unknown")
-            lat = self._coordinator_data.get("latitude", "unknown")
-        else:
-            lon = "unknown"
-            lat = "unknown"
-
-        return {
-            "siteID": self._siteid,
-            "longitude": lon,
-            "latitude": lat,
-        }
+        if (attrs := self.coordinator.attributes.get(self._key[0])) is None:
+            return {
+                "siteID": self._key[0],
+                "longitude": "unknown",
+                "latitude": "unknown",
+            }
+        return attrs
 
 
 class MicroSensor(AQMbaseSensor):
     """Representation of a Taiwan AQM Micro Sensor."""
 
-    def __init__(
-        self,
-        coordinator,
-        station_id,
-        aq_type,
-        device_class,
-        unit_of_measurement=None,
-        state_class=None,
-        display_precision=None,
-        icon=None,
-    ):
+    # 靜態屬性不寫入記錄器
+    _unrecorded_attributes = frozenset({
+        "thingID",
+        "stationID",
+        "Description",
+        "areaType",
+        "areaDescription",
+        "authority",
+        "longitude",
+        "latitude",
+    })
+    _update_time = None
+    _update_time_str = "unknown"
+
+    def __init__(self, coordinator, station_id, description, metadata_on_device=False):
         """Initialize the Micro sensor."""
         super().__init__(
             coordinator,
             station_id,
             "Micro Sensor",
-            aq_type,
-            device_class,
-            unit_of_measurement,
-            state_class,
-            display_precision,
-            icon,
+            description,
+            (
+                coordinator.device_metadata(station_id)
+                if metadata_on_device else None
+            ),
         )
 
-        self._station_id = station_id
-        _LOGGER.debug(
-            "Initialized MicroSensor for station_id: %s, type: %s",
-            self._station_id,
-            self._aq_type,
-        )
+    @property
+    def native_value(self):
+        # 時間窗資料不足時衍生值為未知, 不以 0 代替
+        if (
+            self._key[1] in MICRO_DERIVED_SENSOR_TYPES
+            and self._key not in self.coordinator.values
+        ):
+            return None
+        return super().native_value
+
+    def _format_update_time(self, update_time):
+        """Format the observation time, reusing the last result."""
+        if update_time is None:
+            return "unknown"
+
+        if update_time is not self._update_time:
+            self._update_time = update_time
+            self._update_time_str = as_local(update_time).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        return self._update_time_str
 
+    @property
+    def available(self):
+        # 所屬批次抓取失敗時視為不可用
+        return (
+            super().available
+            and self._key[0] not in self.coordinator.stale_ids
+        )
 
     @property
     def extra_state_attributes(self):
-        if self._coordinator_data:
-            attrs = {
-                "thingID": self._coordinator_data.get("thing_id", "unknown"),
-                "stationID": self._station_id,
-                "Description": self._coordinator_data.get("Description", "unknown"),
-                "areaType": self._coordinator_data.get("areaType", "unknown"),
-                "areaDescription": self._coordinator_data.get("areaDescription", "unknown"),    
-                "authority": self._coordinator_data.get("authority", "unknown"),
-                "longitude": self._coordinator_data.get("longitude", "unknown"),
-                "latitude": self._coordinator_data.get("latitude", "unknown"),
-                "UpdateTime": self._coordinator_data.get(f"{self._aq_type}_time", "unknown"),
-            }
+        station_id, aq_type = self._key
+        if (attrs := self.coordinator.attributes.get(station_id)) is None:
+            return {"stationID": station_id}
 
-            return attrs
-        else:
-            return {
-                "stationID": self._station_id,
-            }
+        station = self.coordinator.data.get(station_id, {})
+        return {
+            **attrs,
+            "UpdateTime": self._format_update_time(station.get(f"{aq_type}_time")),
+        }
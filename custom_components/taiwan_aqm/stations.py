@@ -0,0 +1,226 @@
+"""Cached directory of the micro sensor stations."""
+from __future__ import annotations
+
+import bisect
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.httpx_client import get_async_client
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    HA_USER_AGENT,
+    MICRO_DIRECTORY,
+    MICRO_DIRECTORY_MAX_PAGES,
+    MICRO_DIRECTORY_RETRY,
+    MICRO_DIRECTORY_TTL,
+    MICRO_STATION_API_URL,
+    MICRO_THINGS_API_URL,
+    STORAGE_VERSION,
+)
+from .exceptions import UnexpectedStatusError
+from .geo import GeoGrid
+from .parser import parse_station_page
+
+_LOGGER = logging.getLogger(__name__)
+
+GRID_DEGREES = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class Station:
+    """One micro sensor station in the directory."""
+
+    station_id: str
+    thing_id: int | None
+    area_description: str
+    longitude: float | None = None
+    latitude: float | None = None
+
+    @property
+    def located(self) -> bool:
+        """Return True when the station coordinates are known."""
+        return self.longitude is not None and self.latitude is not None
+
+
+class StationDirectory:
+    """Stations indexed by ID prefix and location.
+
+    IDs are kept sorted for bisect prefix search, and located stations
+    are bucketed into a latitude/longitude grid for nearest queries.
+    """
+
+    def __init__(self, stations, fetched: datetime) -> None:
+        """Build the indexes."""
+        self.fetched = fetched
+        self._by_id: dict[str, Station] = {
+            station.station_id: station for station in stations
+        }
+        self._ids = sorted(self._by_id)
+        self._grid = GeoGrid(
+            (
+                (station.station_id, station.latitude, station.longitude)
+                for station in self._by_id.values()
+                if station.located
+            ),
+            GRID_DEGREES,
+        )
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, station_id: object) -> bool:
+        return station_id in self._by_id
+
+    def get(self, station_id: str) -> Station | None:
+        """Return the station with the given ID."""
+        return self._by_id.get(station_id)
+
+    def expired(self, now: datetime) -> bool:
+        """Return True when the directory is older than its TTL."""
+        return now - self.fetched > MICRO_DIRECTORY_TTL
+
+    def search(self, prefix: str, limit: int | None = None) -> list[Station]:
+        """Return the stations whose ID starts with the prefix."""
+        start = bisect.bisect_left(self._ids, prefix)
+        results = []
+        for station_id in islice(self._ids, start, None):
+            if not station_id.startswith(prefix) or len(results) == limit:
+                break
+            results.append(self._by_id[station_id])
+        return results
+
+    def nearest(
+        self, latitude: float, longitude: float, count: int = 10
+    ) -> list[tuple[Station, float]]:
+        """Return up to count located stations closest to a point, with km."""
+        return [
+            (self._by_id[station_id], distance)
+            for station_id, distance in self._grid.nearest(
+                latitude, longitude, count
+            )
+        ]
+
+    def as_dict(self) -> dict:
+        """Return the directory in its stored form."""
+        return {
+            "fetched": self.fetched.isoformat(),
+            "stations": [
+                [
+                    station.station_id,
+                    station.thing_id,
+                    station.area_description,
+                    station.longitude,
+                    station.latitude,
+                ]
+                for station in self._by_id.values()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict) -> StationDirectory | None:
+        """Rebuild a stored directory, return None when it is invalid."""
+        try:
+            fetched = dt_util.parse_datetime(stored["fetched"])
+            stations = [Station(*row) for row in stored["stations"]]
+        except (KeyError, TypeError, ValueError) as e:
+            _LOGGER.debug("Ignore invalid micro sensor directory: %s", e)
+            return None
+        if fetched is None:
+            return None
+        return cls(stations, fetched)
+
+
+def _store(hass: HomeAssistant) -> Store:
+    """Return the store holding the directory."""
+    key = f"{MICRO_DIRECTORY}_store"
+    if (store := hass.data.get(key)) is None:
+        store = hass.data[key] = Store(hass, STORAGE_VERSION, MICRO_DIRECTORY)
+    return store
+
+
+async def async_fetch_station_directory(hass: HomeAssistant) -> StationDirectory:
+    """Download the Things listing page by page."""
+    client = get_async_client(hass, False)
+    headers = {"Accept": "application/json", "User-Agent": HA_USER_AGENT}
+    url = MICRO_THINGS_API_URL
+    stations = []
+
+    for _ in range(MICRO_DIRECTORY_MAX_PAGES):
+        response = await client.get(url, headers=headers, timeout=30)
+        if not response.is_success:
+            raise UnexpectedStatusError(
+                {"name": "Micro_Sensor", "code": response.status_code}
+            )
+
+        # 解碼與解析不在事件迴圈上執行
+        page, url = await hass.async_add_executor_job(
+            parse_station_page, response.content
+        )
+        stations.extend(Station(*row) for row in page)
+        if not url:
+            break
+    else:
+        _LOGGER.warning(
+            "Micro sensor directory truncated after %d pages",
+            MICRO_DIRECTORY_MAX_PAGES,
+        )
+
+    _LOGGER.debug("Fetched %d micro sensor stations", len(stations))
+    return StationDirectory(stations, dt_util.utcnow())
+
+
+async def async_fetch_station(
+    hass: HomeAssistant, station_id: str
+) -> Station | None:
+    """Look up one station by exact ID, return None when it does not exist."""
+    response = await get_async_client(hass, False).get(
+        # OData 字串中的單引號以兩個單引號表示
+        MICRO_STATION_API_URL.format(stationID=station_id.replace("'", "''")),
+        headers={"Accept": "application/json", "User-Agent": HA_USER_AGENT},
+        timeout=15,
+    )
+    if not response.is_success:
+        raise UnexpectedStatusError(
+            {"name": "Micro_Sensor", "code": response.status_code}
+        )
+
+    stations, _ = await hass.async_add_executor_job(
+        parse_station_page, response.content
+    )
+    for row in stations:
+        if row[0] == station_id:
+            return Station(*row)
+    return None
+
+
+async def async_get_station_directory(
+    hass: HomeAssistant,
+) -> StationDirectory | None:
+    """Return the station directory, refreshing it once it has expired."""
+    directory = hass.data.get(MICRO_DIRECTORY)
+    if directory is None and (stored := await _store(hass).async_load()):
+        directory = StationDirectory.from_dict(stored)
+
+    now = dt_util.utcnow()
+    failed = f"{MICRO_DIRECTORY}_failed"
+    if (directory is None or directory.expired(now)) and (
+        (failed_at := hass.data.get(failed)) is None
+        or now - failed_at > MICRO_DIRECTORY_RETRY
+    ):
+        try:
+            directory = await async_fetch_station_directory(hass)
+            await _store(hass).async_save(directory.as_dict())
+            hass.data.pop(failed, None)
+        except Exception as e:
+            # 取得失敗時沿用過期的目錄, 並暫停重試避免每次開啟流程都重新下載
+            hass.data[failed] = now
+            _LOGGER.warning("Unable to fetch the micro sensor directory: %s", e)
+
+    if directory is not None:
+        hass.data[MICRO_DIRECTORY] = directory
+    return directory